@@ -1,5 +1,6 @@
 from app.services.camera import camera_service
 from app.services.photo import photo_service
+from app.services.session_store import session_store
 from app.services.websocket import websocket_manager
 
 def get_camera_service():
@@ -9,4 +10,7 @@ def get_photo_service():
     return photo_service
 
 def get_websocket_manager():
-    return websocket_manager
\ No newline at end of file
+    return websocket_manager
+
+def get_session_store():
+    return session_store
\ No newline at end of file
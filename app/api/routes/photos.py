@@ -1,33 +1,70 @@
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import FileResponse, Response
+import asyncio
 import os
+import time
 from datetime import datetime
 from app.config import settings
 
 router = APIRouter(prefix="/photos", tags=["photos"])
 
+# (photos directory mtime, entries); the mtime changes on file create/delete/rename.
+# Scans run on worker threads, so the pair is always replaced in a single assignment
+_cache = (-1, [])
+
+# Filesystems with coarse timestamps can give two quick creates the same directory mtime,
+# so a listing is only cached once the directory has been quiet for longer than that granularity
+MTIME_SETTLE_NS = 2_000_000_000
+
+# Saved photos are never rewritten under the same name, so clients may cache them forever
+PHOTO_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
 @router.get("/{filename}")
-async def download_photo(filename: str):
+async def download_photo(filename: str, request: Request):
     filepath = os.path.join(settings.photos_dir, filename)
-    if not os.path.exists(filepath):
+    try:
+        stat = os.stat(filepath)
+    except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Photo not found")
 
-    return FileResponse(filepath, media_type="image/jpeg", filename=filename)
+    headers = {
+        "Cache-Control": PHOTO_CACHE_CONTROL,
+        "ETag": f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    }
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
 
-@router.get("/")
-async def list_photos():
-    photos = []
+    return FileResponse(filepath, media_type="image/jpeg", filename=filename, stat_result=stat, headers=headers)
 
-    if os.path.exists(settings.photos_dir):
-        for filename in os.listdir(settings.photos_dir):
-            if filename.lower().endswith(('.jpg', '.jpeg', '.png')):
-                filepath = os.path.join(settings.photos_dir, filename)
-                stat = os.stat(filepath)
+def _scan_photos() -> list:
+    global _cache
+    try:
+        dir_mtime = os.stat(settings.photos_dir).st_mtime_ns
+    except FileNotFoundError:
+        return []
+
+    cached_mtime, cached_entries = _cache
+    if dir_mtime == cached_mtime:
+        return cached_entries
+
+    photos = []
+    with os.scandir(settings.photos_dir) as it:
+        for entry in it:
+            if entry.name.lower().endswith(('.jpg', '.jpeg', '.png')):
+                stat = entry.stat()
                 photos.append({
-                    "filename": filename,
+                    "filename": entry.name,
                     "size": stat.st_size,
                     "created": datetime.fromtimestamp(stat.st_ctime).isoformat(),
-                    "download_url": f"/api/photos/{filename}"
+                    "download_url": f"/api/photos/{entry.name}"
                 })
 
-    return {"photos": sorted(photos, key=lambda x: x["created"], reverse=True)}
\ No newline at end of file
+    photos.sort(key=lambda x: x["created"], reverse=True)
+    if time.time_ns() - dir_mtime > MTIME_SETTLE_NS:
+        _cache = (dir_mtime, photos)
+    return photos
+
+@router.get("/")
+async def list_photos():
+    photos = await asyncio.to_thread(_scan_photos)
+    return {"photos": photos}
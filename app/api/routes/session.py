@@ -1,6 +1,11 @@
 from fastapi import APIRouter, HTTPException, Depends
-from typing import Optional
+from fastapi.responses import Response
+import asyncio
+import logging
+import struct
 import uuid
+import pybase64
+from typing import List, Optional
 
 from app.models.session import (
     PhotoSession, SessionCreateRequest, PhotoSelectionRequest,
@@ -8,72 +13,84 @@ from app.models.session import (
 )
 from app.services.camera import CameraService
 from app.services.photo import PhotoService
+from app.services.session_store import SessionStore
 from app.services.websocket import WebSocketManager
-from app.api.dependencies import get_camera_service, get_photo_service, get_websocket_manager
+from app.api.dependencies import get_camera_service, get_photo_service, get_session_store, get_websocket_manager
 from app.config import settings
 
 router = APIRouter(prefix="/session", tags=["session"])
-active_sessions: dict = {}
-current_session: Optional[str] = None
+logger = logging.getLogger(__name__)
 
 
 @router.post("/create", response_model=dict)
 async def create_session(
         request: SessionCreateRequest,
+        store: SessionStore = Depends(get_session_store),
         websocket_manager: WebSocketManager = Depends(get_websocket_manager)
 ):
-    global current_session
-
     session_id = str(uuid.uuid4())
     session = PhotoSession(
         session_id=session_id,
         layout=request.layout,
-        orientation=request.orientation
+        orientation=request.orientation,
+        max_capture=settings.capture_limits[request.layout],
+        final_needed=settings.final_limits[request.layout]
     )
 
-    active_sessions[session_id] = session
-    current_session = session_id
+    store.add(session)
+    await websocket_manager.broadcast({"type": "session_state", "session": _status_payload(session)})
 
-    print(f"Created session {session_id} with layout: {request.layout}, orientation: {request.orientation}")
+    logger.info(f"Created session {session_id} with layout: {request.layout}, orientation: {request.orientation}")
 
     return {
         "session_id": session_id,
         "layout": request.layout,
         "orientation": request.orientation,
-        "max_capture_photos": settings.capture_limits[request.layout],
-        "final_photos_needed": settings.final_limits[request.layout]
+        "max_capture_photos": session.max_capture,
+        "final_photos_needed": session.final_needed
     }
 
 
 @router.post("/capture", response_model=PhotoCaptureResponse)
 async def capture_photo(
+        store: SessionStore = Depends(get_session_store),
         camera_service: CameraService = Depends(get_camera_service),
         websocket_manager: WebSocketManager = Depends(get_websocket_manager)
 ):
-    global current_session
-
-    if current_session is None or current_session not in active_sessions:
+    session = store.current()
+    if session is None:
         raise HTTPException(status_code=400, detail="No active session. Please create a session first.")
-
-    session = active_sessions[current_session]
-    photo_b64 = camera_service.capture_photo()
-    session.photos.append(photo_b64)
-
-    print(f"Captured photo {len(session.photos)} for session {current_session}")
-    max_capture_photos = settings.capture_limits[session.layout]
-    final_photos_needed = settings.final_limits[session.layout]
+    if len(session.photos) >= session.max_capture:
+        raise HTTPException(status_code=400, detail="Capture limit reached")
+
+    photo_jpeg, thumbnail_jpeg = await camera_service.capture_photo()
+    # Re-check after the await so overlapping captures cannot push past the limit
+    if len(session.photos) >= session.max_capture:
+        raise HTTPException(status_code=400, detail="Capture limit reached")
+    session.photos.append(photo_jpeg)
+    session.thumbnails.append(thumbnail_jpeg)
+    # Only the capturing client gets the JPEG inline; everyone else fetches it by index
+    photo_b64 = pybase64.b64encode_as_string(photo_jpeg)
+
+    logger.info(f"Captured photo {len(session.photos)} for session {session.session_id}")
+    max_capture_photos = session.max_capture
+    final_photos_needed = session.final_needed
     capture_complete = len(session.photos) >= max_capture_photos
     if capture_complete:
         session.capture_complete = True
 
+    # Clients only need progress here; the photo itself travels in the HTTP response
     await websocket_manager.broadcast({
         "type": "photo_captured",
-        "session_id": current_session,
+        "session_id": session.session_id,
         "photo_count": len(session.photos),
-        "photo": photo_b64,
+        "photo_url": f"/api/session/photos/{len(session.photos) - 1}",
+        "thumbnail_url": f"/api/session/thumbs/{len(session.photos) - 1}",
         "capture_complete": capture_complete,
         "max_capture_photos": max_capture_photos,
-        "final_photos_needed": final_photos_needed
+        "final_photos_needed": final_photos_needed,
+        # Full status so clients can update without a follow-up GET /status
+        "session": _status_payload(session)
     })
 
     return PhotoCaptureResponse(
@@ -89,19 +106,17 @@ async def capture_photo(
 @router.post("/select-photos")
 async def select_photos(
         request: PhotoSelectionRequest,
+        store: SessionStore = Depends(get_session_store),
         websocket_manager: WebSocketManager = Depends(get_websocket_manager)
 ):
-    global current_session
-
-    if current_session is None or current_session not in active_sessions:
+    session = store.current()
+    if session is None:
         raise HTTPException(status_code=404, detail="No active session")
 
-    session = active_sessions[current_session]
-
     if not session.capture_complete:
         raise HTTPException(status_code=400, detail="Photo capture not complete yet")
 
-    final_photos_needed = settings.final_limits[session.layout]
+    final_photos_needed = session.final_needed
 
     if len(request.selected_indices) != final_photos_needed:
         raise HTTPException(status_code=400, detail=f"Must select exactly {final_photos_needed} photos")
@@ -112,11 +127,12 @@ async def select_photos(
     session.selected_photos = request.selected_indices
     session.selection_complete = True
 
-    print(f"Selected photos {request.selected_indices} for session {current_session}")
+    logger.info(f"Selected photos {request.selected_indices} for session {session.session_id}")
     await websocket_manager.broadcast({
         "type": "selection_complete",
-        "session_id": current_session,
-        "selected_indices": request.selected_indices
+        "session_id": session.session_id,
+        "selected_indices": request.selected_indices,
+        "session": _status_payload(session)
     })
 
     return {"success": True, "selected_indices": request.selected_indices}
@@ -124,34 +140,43 @@ async def select_photos(
 
 @router.post("/finalize", response_model=SessionFinalizeResponse)
 async def finalize_session(
+        store: SessionStore = Depends(get_session_store),
         photo_service: PhotoService = Depends(get_photo_service),
         websocket_manager: WebSocketManager = Depends(get_websocket_manager)
 ):
-    global current_session
-
-    if current_session is None or current_session not in active_sessions:
+    session = store.current()
+    if session is None:
         raise HTTPException(status_code=404, detail="No active session")
 
-    session = active_sessions[current_session]
-
     if not session.selection_complete:
         raise HTTPException(status_code=400, detail="Photo selection not complete")
 
-    print(f"Finalizing session {current_session} with selected photos: {session.selected_photos}")
+    session_id = session.session_id
+    # Claimed before the first await, so an overlapping finalize cannot build a second collage
+    if not store.claim(session_id):
+        raise HTTPException(status_code=409, detail="Session is already being finalized")
+
+    logger.info(f"Finalizing session {session_id} with selected photos: {session.selected_photos}")
     selected_photos = [session.photos[i] for i in session.selected_photos]
-    collage_b64 = photo_service.create_collage(selected_photos, session.layout, session.orientation)
-    filename = photo_service.save_photo(collage_b64)
+    try:
+        collage_jpeg = await asyncio.to_thread(
+            photo_service.create_collage, selected_photos, session.layout, session.orientation
+        )
+        filename = await photo_service.save_photo(collage_jpeg)
+    except Exception:
+        # Put the session back so the operator can retry
+        store.restore(session)
+        raise
+    collage_b64 = pybase64.b64encode_as_string(collage_jpeg)
 
     await websocket_manager.broadcast({
         "type": "session_complete",
-        "session_id": current_session,
+        "session_id": session_id,
         "filename": filename,
-        "collage": collage_b64
+        "collage": collage_b64,
+        "session": _status_payload(None)
     })
 
-    del active_sessions[current_session]
-    current_session = None
-
     return SessionFinalizeResponse(
         success=True,
         filename=filename,
@@ -161,10 +186,17 @@ async def finalize_session(
 
 
 @router.get("/status", response_model=SessionStatusResponse)
-async def get_session_status():
-    global current_session
+async def get_session_status(store: SessionStore = Depends(get_session_store)):
+    return _session_status(store.current())
+
+
+def _status_payload(session: Optional[PhotoSession]) -> dict:
+    # Every state change is pushed with the full status so other pages stay in sync without polling
+    return _session_status(session).model_dump(mode="json")
+
 
-    if current_session is None or current_session not in active_sessions:
+def _session_status(session: Optional[PhotoSession]) -> SessionStatusResponse:
+    if session is None:
         return SessionStatusResponse(
             session_id=None,
             photo_count=0,
@@ -176,29 +208,68 @@ async def get_session_status():
             selection_complete=False
         )
 
-    session = active_sessions[current_session]
-    max_capture_photos = settings.capture_limits[session.layout]
-    final_photos_needed = settings.final_limits[session.layout]
-
     return SessionStatusResponse(
-        session_id=current_session,
+        session_id=session.session_id,
         photo_count=len(session.photos),
         layout=session.layout,
         orientation=session.orientation,
-        max_capture_photos=max_capture_photos,
-        final_photos_needed=final_photos_needed,
+        max_capture_photos=session.max_capture,
+        final_photos_needed=session.final_needed,
         capture_complete=session.capture_complete,
         selection_complete=session.selection_complete,
-        selected_photos=session.selected_photos,
-        photos=session.photos if session.capture_complete else []
+        selected_photos=session.selected_photos
     )
 
 
-@router.delete("/reset")
-async def reset_session():
-    global current_session
+def _pack_jpegs(images: List[bytes]) -> Response:
+    # [u32 count][u32 len0][jpeg0][u32 len1][jpeg1]..., big-endian to match DataView defaults
+    parts = [struct.pack(">I", len(images))]
+    for image in images:
+        parts.append(struct.pack(">I", len(image)))
+        parts.append(image)
+    return Response(content=b"".join(parts), media_type="application/octet-stream", headers={"Cache-Control": "no-store"})
 
-    if current_session and current_session in active_sessions:
-        del active_sessions[current_session]
-    current_session = None
+
+def _indexed_jpeg(images: List[bytes], index: int) -> Response:
+    if not 0 <= index < len(images):
+        raise HTTPException(status_code=404, detail="Photo not found")
+
+    # Indices are reused by the next session, so this must never be served from cache
+    return Response(content=images[index], media_type="image/jpeg", headers={"Cache-Control": "no-store"})
+
+
+def _require_session(store: SessionStore) -> PhotoSession:
+    session = store.current()
+    if session is None:
+        raise HTTPException(status_code=404, detail="No active session")
+    return session
+
+
+@router.get("/photos/binary")
+async def get_session_photos_binary(store: SessionStore = Depends(get_session_store)):
+    return _pack_jpegs(_require_session(store).photos)
+
+
+@router.get("/thumbs/binary")
+async def get_session_thumbnails_binary(store: SessionStore = Depends(get_session_store)):
+    return _pack_jpegs(_require_session(store).thumbnails)
+
+
+@router.get("/photos/{index}")
+async def get_session_photo(index: int, store: SessionStore = Depends(get_session_store)):
+    return _indexed_jpeg(_require_session(store).photos, index)
+
+
+@router.get("/thumbs/{index}")
+async def get_session_thumbnail(index: int, store: SessionStore = Depends(get_session_store)):
+    return _indexed_jpeg(_require_session(store).thumbnails, index)
+
+
+@router.delete("/reset")
+async def reset_session(
+        store: SessionStore = Depends(get_session_store),
+        websocket_manager: WebSocketManager = Depends(get_websocket_manager)
+):
+    store.reset()
+    await websocket_manager.broadcast({"type": "session_state", "session": _status_payload(None)})
     return {"success": True}
\ No newline at end of file
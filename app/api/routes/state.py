@@ -0,0 +1,17 @@
+from fastapi import APIRouter, Depends
+
+from app.api.dependencies import get_session_store
+from app.api.routes.session import get_session_status
+from app.config import settings
+from app.services.session_store import SessionStore
+
+router = APIRouter(tags=["state"])
+
+
+@router.get("/initial-state")
+async def get_initial_state(store: SessionStore = Depends(get_session_store)):
+    return {
+        "capture_limits": settings.capture_limits,
+        "final_limits": settings.final_limits,
+        "session": await get_session_status(store)
+    }
@@ -1,31 +1,40 @@
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends
-import json
-import asyncio
+from fastapi import APIRouter, WebSocket, Depends
+from fastapi.responses import StreamingResponse
+import logging
 
-from app.services.camera import CameraService
-from app.services.websocket import WebSocketManager
-from app.api.dependencies import get_camera_service, get_websocket_manager
+from app.services.websocket import MJPEG_BOUNDARY, WebSocketManager
+from app.api.dependencies import get_websocket_manager
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 @router.websocket("/ws")
 async def websocket_endpoint(
     websocket: WebSocket,
-    camera_service: CameraService = Depends(get_camera_service),
     websocket_manager: WebSocketManager = Depends(get_websocket_manager)
 ):
     await websocket_manager.connect(websocket)
     try:
+        # Preview frames are pushed by the shared stream task; this loop only handles control messages
         while True:
-            frame = camera_service.get_preview_frame()
-            if frame:
-                await websocket.send_text(json.dumps({
-                    "type": "preview",
-                    "data": frame
-                }))
-            await asyncio.sleep(1 / 15)  # ~15 FPS
-    except WebSocketDisconnect:
-        websocket_manager.disconnect(websocket)
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            text = message.get("text")
+            if text == "ping":
+                websocket_manager.send(websocket, {"type": "pong"})
+            elif text in ("hidden", "visible"):
+                websocket_manager.set_preview_enabled(websocket, text == "visible")
     except Exception as e:
-        print(f"WebSocket error: {e}")
-        websocket_manager.disconnect(websocket)
\ No newline at end of file
+        logger.error(f"WebSocket error: {e}")
+    finally:
+        websocket_manager.disconnect(websocket)
+
+@router.get("/mjpeg")
+async def mjpeg_stream(websocket_manager: WebSocketManager = Depends(get_websocket_manager)):
+    # Plain <img src="/mjpeg"> viewers get the same shared frames as the WebSocket clients
+    return StreamingResponse(
+        websocket_manager.mjpeg_frames(),
+        media_type=f"multipart/x-mixed-replace; boundary={MJPEG_BOUNDARY}",
+        headers={"Cache-Control": "no-store"}
+    )
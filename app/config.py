@@ -13,13 +13,20 @@ class Settings(BaseSettings):
     camera_width: int = 1920
     camera_height: int = 1080
     camera_fps: int = 30
+    camera_device: str = "/dev/video0"
+    camera_gstreamer: bool = True
     preview_width: int = 640
 
     photo_quality: int = 95
     preview_quality: int = 60
+    thumbnail_size: int = 512
+    thumbnail_quality: int = 75
     photos_dir: str = "app/static/photos"
     templates_dir: str = "app/static/templates"
 
+    session_ttl: int = 600
+    session_sweep_interval: int = 60
+
     capture_limits: dict = {
         "double": 4,
         "quad": 6,
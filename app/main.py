@@ -1,12 +1,77 @@
-from fastapi import FastAPI
+import asyncio
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse
+from fastapi.responses import Response
 
 from app.config import settings
-from app.api.routes import session, photos, websocket
+from app.api.routes import session, photos, state, websocket
 from app.services.camera import camera_service
-from app.templates.index import get_html_template
+from app.services.session_store import session_store
+from app.services.websocket import websocket_manager
+from app.templates.index import (
+    APP_JS_URL, HTML_ETAGS, HTML_LAST_MODIFIED, HTML_VARIANTS, STYLES_URL, get_encoded
+)
+
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+
+INDEX_HEADERS = {
+    "Last-Modified": HTML_LAST_MODIFIED,
+    # The document keeps a stable URL and is revalidated on every load; only its subresources are versioned
+    "Cache-Control": "no-cache",
+    "Vary": "Accept-Encoding",
+    # uvicorn cannot send 103 Early Hints, so announce the subresources on the response itself
+    "Link": f"<{STYLES_URL}>; rel=preload; as=style, <{APP_JS_URL}>; rel=preload; as=script"
+}
+
+
+class VersionedStaticFiles(StaticFiles):
+    # The shell links assets as ?v=<content hash>, so those URLs never change content and can be cached forever
+    def file_response(self, full_path, stat_result, scope, status_code=200):
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        if b"v=" in scope.get("query_string", b""):
+            response.headers["Cache-Control"] = IMMUTABLE_CACHE
+        return response
+
+
+class CachedHTMLResponse(Response):
+    # Raw ASGI headers are built once, so serving skips init_headers/render on every request
+    def __init__(self, body: bytes, headers: dict, status_code: int = 200):
+        self.status_code = status_code
+        self.body = body
+        self.background = None
+        self.raw_headers = [(key.lower().encode("latin-1"), value.encode("latin-1")) for key, value in headers.items()]
+        if status_code != 304:
+            self.raw_headers += [
+                (b"content-type", b"text/html; charset=utf-8"),
+                (b"content-length", str(len(body)).encode("latin-1"))
+            ]
+
+    async def __call__(self, scope, receive, send):
+        # Middleware such as CORS appends to the header list in place, so hand out a copy
+        await send({"type": "http.response.start", "status": self.status_code, "headers": list(self.raw_headers)})
+        await send({"type": "http.response.body", "body": self.body})
+
+
+def _variant_headers(encoding) -> dict:
+    headers = {**INDEX_HEADERS, "ETag": HTML_ETAGS[encoding]}
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    return headers
+
+
+# Content-Encoding -> (200 response, 304 response), each carrying that variant's ETag
+INDEX_RESPONSES = {
+    encoding: (
+        CachedHTMLResponse(body, _variant_headers(encoding)),
+        CachedHTMLResponse(b"", _variant_headers(encoding), status_code=304)
+    )
+    for encoding, body in HTML_VARIANTS.items()
+}
 
 app = FastAPI(
     title=settings.app_name,
@@ -25,19 +90,48 @@ app.add_middleware(
 # Include routers
 app.include_router(session.router, prefix="/api")
 app.include_router(photos.router, prefix="/api")
+app.include_router(state.router, prefix="/api")
 app.include_router(websocket.router)
-app.mount("/static", StaticFiles(directory="app/static"), name="static")
+app.mount("/static", VersionedStaticFiles(directory="app/static"), name="static")
+
+def setup_logging() -> QueueListener:
+    # Handlers run on the listener thread so log writes never block the event loop
+    log_queue = queue.SimpleQueue()
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    listener = QueueListener(log_queue, handler)
+
+    root = logging.getLogger()
+    root.addHandler(QueueHandler(log_queue))
+    root.setLevel(logging.DEBUG if settings.debug else logging.INFO)
+    listener.start()
+    return listener
 
 @app.on_event("startup")
 async def startup_event():
+    app.state.log_listener = setup_logging()
     camera_service.initialize()
+    app.state.preview_task = asyncio.create_task(websocket_manager.stream_preview(camera_service))
+    app.state.eviction_task = asyncio.create_task(session_store.run_eviction(settings.session_sweep_interval))
 
 @app.on_event("shutdown")
 async def shutdown_event():
+    app.state.preview_task.cancel()
+    app.state.eviction_task.cancel()
     camera_service.cleanup()
+    app.state.log_listener.stop()
+
 @app.get("/")
-async def get_index():
-    return HTMLResponse(get_html_template())
+async def get_index(request: Request):
+    _, encoding = get_encoded(request.headers.get("accept-encoding", ""))
+    response, not_modified = INDEX_RESPONSES[encoding]
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match == HTML_ETAGS[encoding] or (
+        if_none_match is None and request.headers.get("if-modified-since") == HTML_LAST_MODIFIED
+    ):
+        return not_modified
+    return response
 
 @app.get("/health")
 async def health_check():
@@ -1,6 +1,7 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional
 from enum import Enum
+import time
 
 class LayoutType(str, Enum):
     double = "double"
@@ -13,13 +14,17 @@ class OrientationType(str, Enum):
 
 class PhotoSession(BaseModel):
     session_id: str
-    photos: List[str] = []
+    photos: List[bytes] = []
+    thumbnails: List[bytes] = []
     selected_photos: List[int] = []
     layout: LayoutType = LayoutType.double
     orientation: OrientationType = OrientationType.portrait
+    max_capture: int
+    final_needed: int
     template: Optional[str] = None
     capture_complete: bool = False
     selection_complete: bool = False
+    last_accessed: float = Field(default_factory=time.monotonic)
 
 class SessionCreateRequest(BaseModel):
     layout: LayoutType = LayoutType.double
@@ -38,7 +43,6 @@ class SessionStatusResponse(BaseModel):
     capture_complete: bool
     selection_complete: bool
     selected_photos: List[int] = []
-    photos: List[str] = []
 
 class PhotoCaptureResponse(BaseModel):
     success: bool
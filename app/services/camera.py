@@ -1,62 +1,177 @@
 import cv2
-import base64
+import simplejpeg
+import asyncio
+import logging
+import sys
+import threading
+import time
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
 from fastapi import HTTPException
 from app.config import settings
 
+logger = logging.getLogger(__name__)
+
+GRAB_RETRY_DELAY = 0.05
+# Frames older than this mean the device has stalled, so captures fail instead of reusing them
+MAX_FRAME_AGE = 1.0
+
+# USB cameras only reach full resolution at full frame rate as MJPEG, so that is what v4l2src asks for;
+# appsink keeps a single buffer and drops the rest, matching the latest-frame-only grabber
+GSTREAMER_PIPELINE = (
+    "v4l2src device={device} ! image/jpeg,width={width},height={height},framerate={fps}/1 ! "
+    "jpegdec ! videoconvert ! video/x-raw,format=BGR ! appsink drop=1 max-buffers=1"
+)
+
 class CameraService:
     def __init__(self):
         self.camera = None
         self.is_active = False
+        self._preview_size = None
+        self._resize_buf = None
+        self._preview_buf = None
+        self._lock = threading.Lock()
+        self._init_lock = threading.Lock()
+        self._preview_lock = threading.Lock()
+        self._frame_ready = threading.Event()
+        self._latest = None
+        self._latest_at = 0.0
+        self._grab_thread = None
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="camera")
 
     def initialize(self) -> bool:
         try:
-            self.camera = cv2.VideoCapture(0)
+            self.camera = self._open_camera()
             if not self.camera.isOpened():
                 raise Exception("Could not open camera")
 
-            self.camera.set(cv2.CAP_PROP_FRAME_WIDTH, settings.camera_width)
-            self.camera.set(cv2.CAP_PROP_FRAME_HEIGHT, settings.camera_height)
-            self.camera.set(cv2.CAP_PROP_FPS, settings.camera_fps)
+            width = int(self.camera.get(cv2.CAP_PROP_FRAME_WIDTH)) or settings.camera_width
+            height = int(self.camera.get(cv2.CAP_PROP_FRAME_HEIGHT)) or settings.camera_height
+            self._allocate_preview_buffers(width, height)
 
             self.is_active = True
+            self._grab_thread = threading.Thread(target=self._grab_loop, name="camera-grabber", daemon=True)
+            self._grab_thread.start()
             return True
         except Exception as e:
-            print(f"Camera initialization failed: {e}")
+            logger.error(f"Camera initialization failed: {e}")
             return False
 
-    def capture_photo(self) -> str:
-        if not self.is_active or self.camera is None:
-            if not self.initialize():
-                raise HTTPException(status_code=500, detail="Camera not available")
+    def _open_camera(self) -> cv2.VideoCapture:
+        if settings.camera_gstreamer and sys.platform.startswith("linux"):
+            camera = cv2.VideoCapture(GSTREAMER_PIPELINE.format(
+                device=settings.camera_device,
+                width=settings.camera_width,
+                height=settings.camera_height,
+                fps=settings.camera_fps
+            ), cv2.CAP_GSTREAMER)
+            if camera.isOpened():
+                return camera
+            camera.release()
+            logger.info("GStreamer capture unavailable, falling back to the default backend")
 
-        ret, frame = self.camera.read()
-        if not ret:
-            raise HTTPException(status_code=500, detail="Failed to capture photo")
+        camera = cv2.VideoCapture(0)
+        # USB cameras only reach full resolution at full frame rate when they send compressed frames;
+        # the FOURCC has to be set before the size for V4L2 to negotiate it
+        camera.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*"MJPG"))
+        camera.set(cv2.CAP_PROP_FRAME_WIDTH, settings.camera_width)
+        camera.set(cv2.CAP_PROP_FRAME_HEIGHT, settings.camera_height)
+        camera.set(cv2.CAP_PROP_FPS, settings.camera_fps)
+        return camera
 
-        frame = cv2.flip(frame, 1)
-        _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, settings.photo_quality])
-        return base64.b64encode(buffer).decode('utf-8')
+    def _grab_loop(self):
+        # Keep only the most recent frame so readers never block on the device
+        while self.is_active:
+            ret, frame = self.camera.read()
+            if not ret:
+                self._frame_ready.clear()
+                # Back off instead of spinning a core while the device is unplugged or stalled
+                time.sleep(GRAB_RETRY_DELAY)
+                continue
+            with self._lock:
+                self._latest = frame
+                self._latest_at = time.monotonic()
+            self._frame_ready.set()
 
-    def get_preview_frame(self) -> str:
-        if not self.is_active or self.camera is None:
-            if not self.initialize():
-                return None
+    def _ensure_active(self) -> bool:
+        with self._init_lock:
+            if self.is_active and self.camera is not None:
+                return True
+            return self.initialize()
 
-        ret, frame = self.camera.read()
-        if not ret:
+    def _latest_frame(self, timeout: float = 2.0) -> Optional[np.ndarray]:
+        if not self._ensure_active():
             return None
 
+        if not self._frame_ready.wait(timeout):
+            return None
+        with self._lock:
+            if time.monotonic() - self._latest_at > MAX_FRAME_AGE:
+                return None
+            return self._latest
+
+    def _allocate_preview_buffers(self, width: int, height: int):
+        preview_height = int(height * settings.preview_width / width)
+        self._preview_size = (settings.preview_width, preview_height)
+        self._resize_buf = np.empty((preview_height, settings.preview_width, 3), np.uint8)
+        self._preview_buf = np.empty_like(self._resize_buf)
+
+    def _encode_full(self) -> Tuple[bytes, bytes]:
+        if not self._ensure_active():
+            raise HTTPException(status_code=500, detail="Camera not available")
+
+        frame = self._latest_frame()
+        if frame is None:
+            raise HTTPException(status_code=500, detail="Failed to capture photo")
+
         frame = cv2.flip(frame, 1)
+        photo = simplejpeg.encode_jpeg(frame, quality=settings.photo_quality, colorspace='BGR')
+
+        # The selection grid only needs a small copy; scaling the raw frame avoids decoding the JPEG again
         height, width = frame.shape[:2]
-        preview_height = int(height * settings.preview_width / width)
-        frame = cv2.resize(frame, (settings.preview_width, preview_height))
+        scale = settings.thumbnail_size / max(width, height)
+        thumbnail = cv2.resize(frame, (int(width * scale), int(height * scale)), interpolation=cv2.INTER_AREA)
+        return photo, simplejpeg.encode_jpeg(
+            thumbnail, quality=settings.thumbnail_quality, colorspace='BGR', fastdct=True
+        )
+
+    def _encode_preview(self) -> Optional[bytes]:
+        frame = self._latest_frame()
+        if frame is None:
+            return None
 
-        _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, settings.preview_quality])
-        return base64.b64encode(buffer).decode('utf-8')
+        with self._preview_lock:
+            height, width = frame.shape[:2]
+            if self._preview_size is None or self._preview_size[1] != int(height * settings.preview_width / width):
+                self._allocate_preview_buffers(width, height)
+
+            # Resize before flipping so the mirror pass only touches preview-sized pixels
+            cv2.resize(frame, self._preview_size, dst=self._resize_buf, interpolation=cv2.INTER_AREA)
+            cv2.flip(self._resize_buf, 1, dst=self._preview_buf)
+
+            return simplejpeg.encode_jpeg(
+                self._preview_buf, quality=settings.preview_quality, colorspace='BGR', fastdct=True
+            )
+
+    async def capture_photo(self) -> Tuple[bytes, bytes]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._encode_full)
+
+    async def get_preview_frame(self) -> Optional[bytes]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._encode_preview)
 
     def cleanup(self):
+        self.is_active = False
+        if self._grab_thread:
+            self._grab_thread.join(timeout=1.0)
+            self._grab_thread = None
+        self._frame_ready.clear()
+        self._latest = None
+        self._latest_at = 0.0
         if self.camera:
             self.camera.release()
-            self.is_active = False
+        self._executor.shutdown(wait=False)
 
-camera_service = CameraService()
\ No newline at end of file
+camera_service = CameraService()
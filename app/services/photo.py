@@ -1,192 +1,168 @@
 from PIL import Image, ImageDraw, ImageFont
-import base64
-import io
+import cv2
+import numpy as np
+import simplejpeg
+import asyncio
+import logging
 import os
+import threading
 import uuid
 from datetime import datetime
+from functools import lru_cache
 from typing import List
 from app.config import settings
 from app.models.session import LayoutType, OrientationType
 
+logger = logging.getLogger(__name__)
+
+# Smallest decode size that still covers every tile of a layout in either orientation
+DRAFT_SIZES = {
+    LayoutType.double: (600, 600),
+    LayoutType.quad: (400, 300),
+    LayoutType.strip: (280, 280)
+}
+
+
+def _grid(target_size: tuple, cols: int, rows: int, gap: int) -> tuple:
+    tiles = [
+        (target_size, (gap + col * (target_size[0] + gap), gap + row * (target_size[1] + gap)))
+        for row in range(rows)
+        for col in range(cols)
+    ]
+    canvas_size = (target_size[0] * cols + gap * (cols + 1), target_size[1] * rows + gap * (rows + 1))
+    return tiles, canvas_size
+
+
+@lru_cache(maxsize=8)
+def _double(orientation: OrientationType, shape1: tuple, shape2: tuple, gap: int = 20) -> tuple:
+    # Tile sizes follow each photo's aspect ratio; one camera yields one shape, so this is computed once
+    if orientation == OrientationType.landscape:
+        target_height = 600
+        size1 = (int(target_height * shape1[1] / shape1[0]), target_height)
+        size2 = (int(target_height * shape2[1] / shape2[0]), target_height)
+        tiles = [(size1, (gap, gap)), (size2, (size1[0] + gap * 2, gap))]
+        canvas_size = (size1[0] + size2[0] + gap * 3, target_height + gap * 2)
+    else:
+        target_width = 600
+        size1 = (target_width, int(target_width * shape1[0] / shape1[1]))
+        size2 = (target_width, int(target_width * shape2[0] / shape2[1]))
+        tiles = [(size1, (gap, gap)), (size2, (gap, size1[1] + gap * 2))]
+        canvas_size = (target_width + gap * 2, size1[1] + size2[1] + gap * 3)
+    return tiles, canvas_size
+
+# (layout, orientation) -> ([(tile size, tile position)], canvas size) for the fixed-grid layouts
+GRID_LAYOUTS = {
+    (LayoutType.quad, OrientationType.landscape): _grid((400, 300), 2, 2, 20),
+    (LayoutType.quad, OrientationType.portrait): _grid((350, 250), 1, 4, 15),
+    (LayoutType.strip, OrientationType.portrait): _grid((280, 200), 2, 4, 15),
+    (LayoutType.strip, OrientationType.landscape): _grid((200, 280), 4, 2, 15)
+}
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+FONT_PATHS = [
+    "arial.ttf",
+    "/System/Library/Fonts/Arial.ttf",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf"
+]
+
 
 class PhotoService:
-    def create_collage(self, photos: List[str], layout: LayoutType, orientation: OrientationType) -> str:
+    def __init__(self):
+        # (width, height) -> canvas reused by every collage of that size; held for fill, blit and encode
+        self._canvases = {}
+        self._canvas_lock = threading.Lock()
+        self._font = self._load_font()
+        # Every timestamp has the same shape, so one representative string fixes the text box
+        self._timestamp_bbox = self._font.getbbox(datetime(2000, 1, 1).strftime(TIMESTAMP_FORMAT))
+
+    def _load_font(self) -> ImageFont.ImageFont:
+        for font_path in FONT_PATHS:
+            try:
+                return ImageFont.truetype(font_path, 24)
+            except Exception:
+                continue
+
+        return ImageFont.load_default()
+
+    def create_collage(self, photos: List[bytes], layout: LayoutType, orientation: OrientationType) -> bytes:
         if not photos:
             raise ValueError("No photos provided")
-        pil_images = []
-        for photo_b64 in photos:
-            img_data = base64.b64decode(photo_b64)
-            img = Image.open(io.BytesIO(img_data))
-            pil_images.append(img)
-
-        print(f"Creating collage with {len(pil_images)} images for layout: {layout}, orientation: {orientation}")
+        images = []
+        for photo_jpeg in photos:
+            # libjpeg-turbo picks the largest DCT scale-down that still covers the tile size
+            min_width, min_height = DRAFT_SIZES.get(layout, (0, 0))
+            img = simplejpeg.decode_jpeg(
+                photo_jpeg, colorspace='BGR', fastdct=True, fastupsample=True,
+                min_width=min_width, min_height=min_height
+            )
+            images.append(img)
+
+        logger.info(f"Creating collage with {len(images)} images for layout: {layout}, orientation: {orientation}")
 
         if layout == LayoutType.double:
-            final_img = self._create_double_layout(pil_images, orientation)
-        elif layout == LayoutType.quad:
-            final_img = self._create_quad_layout(pil_images, orientation)
-        elif layout == LayoutType.strip:
-            final_img = self._create_strip_layout(pil_images, orientation)
-        else:
-            final_img = pil_images[0]
-
-        final_img = self._add_timestamp(final_img)
-        buffer = io.BytesIO()
-        final_img.save(buffer, format='JPEG', quality=settings.photo_quality)
-        return base64.b64encode(buffer.getvalue()).decode('utf-8')
-
-    def _create_double_layout(self, images: List[Image.Image], orientation: OrientationType) -> Image.Image:
-        img1, img2 = images[0], images[1]
-
-        if orientation == OrientationType.landscape:
-            target_height = 600
-            img1_ratio = img1.width / img1.height
-            img2_ratio = img2.width / img2.height
-
-            img1 = img1.resize((int(target_height * img1_ratio), target_height))
-            img2 = img2.resize((int(target_height * img2_ratio), target_height))
-
-            gap = 20
-            total_width = img1.width + img2.width + gap * 3
-            total_height = target_height + gap * 2
-
-            final_img = Image.new('RGB', (total_width, total_height), 'white')
-            final_img.paste(img1, (gap, gap))
-            final_img.paste(img2, (img1.width + gap * 2, gap))
-        else:
-            target_width = 600
-            img1_ratio = img1.height / img1.width
-            img2_ratio = img2.height / img2.width
-
-            img1 = img1.resize((target_width, int(target_width * img1_ratio)))
-            img2 = img2.resize((target_width, int(target_width * img2_ratio)))
-
-            gap = 20
-            total_width = target_width + gap * 2
-            total_height = img1.height + img2.height + gap * 3
-
-            final_img = Image.new('RGB', (total_width, total_height), 'white')
-            final_img.paste(img1, (gap, gap))
-            final_img.paste(img2, (gap, img1.height + gap * 2))
-
-        return final_img
-
-    def _create_quad_layout(self, images: List[Image.Image], orientation: OrientationType) -> Image.Image:
-        images = images[:4]
-
-        if orientation == OrientationType.landscape:
-            target_size = (400, 300)
-            cols, rows = 2, 2
+            geometry = _double(orientation, images[0].shape[:2], images[1].shape[:2])
         else:
-            target_size = (350, 250)
-            cols, rows = 1, 4
-
-        resized_images = [img.resize(target_size, Image.Resampling.LANCZOS) for img in images]
-
-        gap = 20 if orientation == OrientationType.landscape else 15
-        final_width = target_size[0] * cols + gap * (cols + 1)
-        final_height = target_size[1] * rows + gap * (rows + 1)
-
-        final_img = Image.new('RGB', (final_width, final_height), 'white')
-
-        positions = []
-        for row in range(rows):
-            for col in range(cols):
-                x = gap + col * (target_size[0] + gap)
-                y = gap + row * (target_size[1] + gap)
-                positions.append((x, y))
-
-        for img, pos in zip(resized_images, positions):
-            final_img.paste(img, pos)
-
-        return final_img
-
-    def _create_strip_layout(self, images: List[Image.Image], orientation: OrientationType) -> Image.Image:
-        images = images[:8]
-
-        if orientation == OrientationType.portrait:
-            target_size = (280, 200)
-            cols, rows = 2, 4
-        else:
-            target_size = (200, 280)
-            cols, rows = 4, 2
-
-        resized_images = [img.resize(target_size, Image.Resampling.LANCZOS) for img in images]
-
-        gap = 15
-        final_width = target_size[0] * cols + gap * (cols + 1)
-        final_height = target_size[1] * rows + gap * (rows + 1)
-
-        final_img = Image.new('RGB', (final_width, final_height), 'white')
-        positions = []
-        for row in range(rows):
-            for col in range(cols):
-                x = gap + col * (target_size[0] + gap)
-                y = gap + row * (target_size[1] + gap)
-                positions.append((x, y))
-
-        for img, pos in zip(resized_images, positions):
-            final_img.paste(img, pos)
-
-        return final_img
-
-    def _add_timestamp(self, img: Image.Image) -> Image.Image:
-        draw = ImageDraw.Draw(img)
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-        # Try to load font
-        font = None
-        font_paths = [
-            "arial.ttf",
-            "/System/Library/Fonts/Arial.ttf",
-            "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf"
-        ]
-
-        for font_path in font_paths:
-            try:
-                font = ImageFont.truetype(font_path, 24)
-                break
-            except:
-                continue
-
-        if not font:
-            font = ImageFont.load_default()
-
-        text_bbox = draw.textbbox((0, 0), timestamp, font=font)
+            geometry = GRID_LAYOUTS.get((layout, orientation))
+
+        if geometry is None:
+            canvas = images[0]
+            self._add_timestamp(canvas)
+            return simplejpeg.encode_jpeg(canvas, quality=settings.photo_quality, colorspace='BGR')
+
+        tiles, canvas_size = geometry
+        resized = [cv2.resize(image, size, interpolation=cv2.INTER_AREA) for image, (size, _) in zip(images, tiles)]
+        with self._canvas_lock:
+            canvas = self._canvases.get(canvas_size)
+            if canvas is None:
+                canvas = self._canvases[canvas_size] = np.empty((canvas_size[1], canvas_size[0], 3), np.uint8)
+            canvas.fill(255)
+            for tile, (size, (x, y)) in zip(resized, tiles):
+                canvas[y:y + size[1], x:x + size[0]] = tile
+
+            self._add_timestamp(canvas)
+            # The encoder copies the pixels out, so the buffer is free for the next collage afterwards
+            return simplejpeg.encode_jpeg(canvas, quality=settings.photo_quality, colorspace='BGR')
+
+    def _add_timestamp(self, canvas: np.ndarray):
+        timestamp = datetime.now().strftime(TIMESTAMP_FORMAT)
+
+        font = self._font
+        text_bbox = self._timestamp_bbox
         text_width = text_bbox[2] - text_bbox[0]
         text_height = text_bbox[3] - text_bbox[1]
 
-        text_x = (img.width - text_width) // 2
-        text_y = img.height - text_height - 20
+        canvas_height, canvas_width = canvas.shape[:2]
+        text_x = (canvas_width - text_width) // 2
+        text_y = canvas_height - text_height - 20
 
         background_padding = 10
-        background_bbox = [
-            text_x - background_padding,
-            text_y - background_padding,
-            text_x + text_width + background_padding,
-            text_y + text_height + background_padding
-        ]
-
-        overlay = Image.new('RGBA', img.size, (255, 255, 255, 0))
-        overlay_draw = ImageDraw.Draw(overlay)
-        overlay_draw.rectangle(background_bbox, fill=(0, 0, 0, 128))
-
-        img = Image.alpha_composite(img.convert('RGBA'), overlay).convert('RGB')
-        draw = ImageDraw.Draw(img)
-        draw.text((text_x, text_y), timestamp, fill='white', font=font)
-
-        return img
-
-    def save_photo(self, photo_b64: str, filename: str = None) -> str:
+        left = max(text_x - background_padding, 0)
+        top = max(text_y - background_padding, 0)
+        right = min(text_x + text_width + background_padding + 1, canvas_width)
+        bottom = min(text_y + text_height + background_padding + 1, canvas_height)
+
+        # Halving the strip matches a 50% black overlay; only the strip round-trips through PIL for the text
+        strip = canvas[top:bottom, left:right]
+        strip >>= 1
+        strip_img = Image.fromarray(strip)
+        ImageDraw.Draw(strip_img).text((text_x - left, text_y - top), timestamp, fill='white', font=font)
+        canvas[top:bottom, left:right] = np.asarray(strip_img)
+
+    async def save_photo(self, img_data: bytes, filename: str = None) -> str:
         if filename is None:
             filename = f"photo_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}.jpg"
 
         filepath = os.path.join(settings.photos_dir, filename)
-
-        img_data = base64.b64decode(photo_b64)
-        with open(filepath, 'wb') as f:
-            f.write(img_data)
+        await asyncio.to_thread(self._write_file, filepath, img_data)
 
         return filename
 
+    def _write_file(self, filepath: str, data: bytes):
+        # The photo name only appears once the bytes are complete, so a concurrent listing never sees a partial file
+        tmp_path = f"{filepath}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, filepath)
+
 photo_service = PhotoService()
\ No newline at end of file
@@ -0,0 +1,72 @@
+from typing import Dict, Optional
+import asyncio
+import logging
+import threading
+import time
+
+from app.config import settings
+from app.models.session import PhotoSession
+
+logger = logging.getLogger(__name__)
+
+
+class SessionStore:
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.current_id: Optional[str] = None
+        self._sessions: Dict[str, PhotoSession] = {}
+        self._lock = threading.Lock()
+
+    def add(self, session: PhotoSession):
+        with self._lock:
+            self._sessions[session.session_id] = session
+            self.current_id = session.session_id
+
+    def current(self) -> Optional[PhotoSession]:
+        with self._lock:
+            session = self._sessions.get(self.current_id) if self.current_id else None
+            if session is not None:
+                session.last_accessed = time.monotonic()
+            return session
+
+    def claim(self, session_id: str) -> bool:
+        # Takes the session out of the store so exactly one caller proceeds with it
+        with self._lock:
+            if self._sessions.pop(session_id, None) is None:
+                return False
+            if self.current_id == session_id:
+                self.current_id = None
+            return True
+
+    def restore(self, session: PhotoSession):
+        # Puts back a claimed session without displacing one created or reset in the meantime
+        with self._lock:
+            self._sessions[session.session_id] = session
+            if self.current_id is None:
+                self.current_id = session.session_id
+
+    def reset(self):
+        with self._lock:
+            if self.current_id:
+                self._sessions.pop(self.current_id, None)
+            self.current_id = None
+
+    def evict_expired(self) -> int:
+        cutoff = time.monotonic() - self.ttl
+        with self._lock:
+            expired = [sid for sid, session in self._sessions.items() if session.last_accessed < cutoff]
+            for session_id in expired:
+                del self._sessions[session_id]
+            if self.current_id in expired:
+                self.current_id = None
+        return len(expired)
+
+    async def run_eviction(self, interval: float):
+        # Abandoned sessions hold every captured JPEG, so they are dropped once idle past the TTL
+        while True:
+            await asyncio.sleep(interval)
+            evicted = self.evict_expired()
+            if evicted:
+                logger.info(f"Evicted {evicted} idle session(s)")
+
+session_store = SessionStore(ttl=settings.session_ttl)
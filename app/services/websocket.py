@@ -1,29 +1,142 @@
-from typing import List
-import json
+from typing import AsyncIterator, Dict, Optional
+import asyncio
+import logging
+import orjson
 from fastapi import WebSocket
 
+logger = logging.getLogger(__name__)
+
+PREVIEW_INTERVAL = 1 / 15  # ~15 FPS
+MJPEG_BOUNDARY = "frame"
+
+
+class ClientChannel:
+    # Outbound side of one connection: events are queued and always delivered, while previews
+    # keep a single slot that newer frames overwrite, so a slow client skips frames instead of lagging
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self.pending_preview: Optional[bytes] = None
+        # Cleared while the page is hidden so no frames are sent to a tab nobody is looking at
+        self.preview_enabled = True
+        self.events: asyncio.Queue = asyncio.Queue()
+        self._wakeup = asyncio.Event()
+
+    def push_preview(self, frame: bytes):
+        self.pending_preview = frame
+        self._wakeup.set()
+
+    def push_event(self, payload: str):
+        self.events.put_nowait(payload)
+        self._wakeup.set()
+
+    def _drain_events(self) -> str:
+        # Events queued while the previous send was in flight go out as one message
+        payloads = []
+        while not self.events.empty():
+            payloads.append(self.events.get_nowait())
+        if len(payloads) == 1:
+            return payloads[0]
+        return '{"type":"batch","events":[' + ",".join(payloads) + "]}"
+
+    async def run(self):
+        try:
+            while True:
+                await self._wakeup.wait()
+                self._wakeup.clear()
+                if not self.events.empty():
+                    await self.websocket.send_text(self._drain_events())
+                frame, self.pending_preview = self.pending_preview, None
+                if frame is not None:
+                    await self.websocket.send_bytes(frame)
+        except Exception as e:
+            # The peer went away mid-send; returning lets the done callback drop the connection
+            logger.info(f"WebSocket send failed, closing channel: {e}")
+
 
 class WebSocketManager:
     def __init__(self):
-        self.active_connections: List[WebSocket] = []
+        self.active_connections: Dict[WebSocket, ClientChannel] = {}
+        self._sender_tasks: Dict[WebSocket, asyncio.Task] = {}
+        self.latest_frame: Optional[bytes] = None
+        self._frame_cond = asyncio.Condition()
+        self._mjpeg_viewers = 0
 
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
-        self.active_connections.append(websocket)
+        channel = ClientChannel(websocket)
+        self.active_connections[websocket] = channel
+        task = asyncio.create_task(channel.run())
+        task.add_done_callback(lambda _: self.disconnect(websocket))
+        self._sender_tasks[websocket] = task
 
     def disconnect(self, websocket: WebSocket):
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
+        self.active_connections.pop(websocket, None)
+        task = self._sender_tasks.pop(websocket, None)
+        if task is not None:
+            task.cancel()
+
+    def set_preview_enabled(self, websocket: WebSocket, enabled: bool):
+        channel = self.active_connections.get(websocket)
+        if channel is not None:
+            channel.preview_enabled = enabled
+            if not enabled:
+                channel.pending_preview = None
+
+    def _wants_preview(self) -> bool:
+        return self._mjpeg_viewers > 0 or any(
+            channel.preview_enabled for channel in self.active_connections.values()
+        )
+
+    def send(self, websocket: WebSocket, message: dict):
+        channel = self.active_connections.get(websocket)
+        if channel is not None:
+            channel.push_event(orjson.dumps(message).decode())
 
     async def broadcast(self, message: dict):
-        disconnected = []
-        for connection in self.active_connections:
+        """Queue one JSON event for every connected client.
+
+        The message is serialised exactly once and the same payload is reused
+        for every connection, so callers should pass already-encoded data
+        (e.g. base64 photos) rather than re-encoding per client.
+        """
+        # Binary frames are reserved for preview JPEGs, so JSON still goes out as text
+        payload = orjson.dumps(message).decode()
+        for channel in list(self.active_connections.values()):
+            channel.push_event(payload)
+
+    async def broadcast_bytes(self, data: bytes):
+        for channel in list(self.active_connections.values()):
+            if channel.preview_enabled:
+                channel.push_preview(data)
+
+    async def stream_preview(self, camera_service):
+        # One grab/resize/encode per tick, shared by every client instead of one per connection;
+        # nothing is encoded while every page is hidden
+        while True:
             try:
-                await connection.send_text(json.dumps(message))
-            except Exception:
-                disconnected.append(connection)
+                if self._wants_preview():
+                    frame = await camera_service.get_preview_frame()
+                    if frame:
+                        async with self._frame_cond:
+                            self.latest_frame = frame
+                            self._frame_cond.notify_all()
+                        await self.broadcast_bytes(frame)
+            except Exception as e:
+                logger.error(f"Preview stream error: {e}")
+            await asyncio.sleep(PREVIEW_INTERVAL)
 
-        for connection in disconnected:
-            self.disconnect(connection)
+    async def mjpeg_frames(self) -> AsyncIterator[bytes]:
+        # multipart/x-mixed-replace parts; the frame is yielded on its own so it is never copied
+        self._mjpeg_viewers += 1
+        try:
+            while True:
+                async with self._frame_cond:
+                    await self._frame_cond.wait()
+                    frame = self.latest_frame
+                yield f"--{MJPEG_BOUNDARY}\r\nContent-Type: image/jpeg\r\nContent-Length: {len(frame)}\r\n\r\n".encode()
+                yield frame
+                yield b"\r\n"
+        finally:
+            self._mjpeg_viewers -= 1
 
-websocket_manager = WebSocketManager()
\ No newline at end of file
+websocket_manager = WebSocketManager()
@@ -2,16 +2,44 @@ let ws = null;
 let selectedLayout = 'double';
 let selectedOrientation = 'portrait';
 let captureMode = 'manual';
-let autoTimeout = null;
+let autoBurst = null;
 let currentSessionData = null;
 let selectedPhotoIndices = [];
 let isFullscreen = false;
+let previewCtx = null;
+let latestPreview = null;
+let previewFramePending = false;
+let selectionPhotoUrls = [];
+let els = null;
+let photoOptionEls = [];
+let indicatorEls = [];
+let lastStatusText = '';
+let lastGalleryBody = null;
+
+const WS_BACKOFF_MIN = 500;
+const WS_BACKOFF_MAX = 30000;
+const HEARTBEAT_INTERVAL = 15000;
+const HEARTBEAT_TIMEOUT = 30000;
+const STATUS_POLL_INTERVAL = 10000;
+let wsBackoff = WS_BACKOFF_MIN;
+let lastMessageAt = 0;
+let heartbeatTimer = null;
+let pollTimer = null;
+
+const COUNTDOWN_MS = 3500;
+const SMILE_MS = 500;
+const BURST_START_DELAY = 2000;
+const BURST_GAP = 3000;
+
+// Shared by every gallery row instead of resolving locale data per photo
+const GALLERY_DATE_FORMAT = new Intl.DateTimeFormat(undefined, { dateStyle: 'short', timeStyle: 'medium' });
+const GALLERY_SIZE_FORMAT = new Intl.NumberFormat(undefined, { minimumFractionDigits: 1, maximumFractionDigits: 1 });
 
 const CAPTURE_LIMITS = { double: 4, quad: 6, strip: 12 };
 const FINAL_LIMITS = { double: 2, quad: 4, strip: 8 };
 
 function toggleSettingsDropdown() {
-    const dropdown = document.getElementById('settingsDropdown');
+    const dropdown = els.settingsDropdown;
     dropdown.classList.toggle('open');
     console.log('Dropdown toggled, open:', dropdown.classList.contains('open'));
 }
@@ -42,10 +70,10 @@ function selectMode(mode) {
     const btn = document.querySelector(`[data-mode="${mode}"]`);
     if (btn) btn.classList.add('active');
 
-    const takePhotoBtn = document.getElementById('takePhotoBtn');
-    const startAutoBtn = document.getElementById('startAutoBtn');
-    const stopAutoBtn = document.getElementById('stopAutoBtn');
-    const autoModeInfo = document.getElementById('autoModeInfo');
+    const takePhotoBtn = els.takePhotoBtn;
+    const startAutoBtn = els.startAutoBtn;
+    const stopAutoBtn = els.stopAutoBtn;
+    const autoModeInfo = els.autoModeInfo;
 
     if (mode === 'manual') {
         if (takePhotoBtn) takePhotoBtn.style.display = 'block';
@@ -72,7 +100,10 @@ async function takePhoto() {
     }
 
     await showCountdown();
+    await capturePhoto();
+}
 
+async function capturePhoto() {
     try {
         const response = await fetch('/api/session/capture', {
             method: 'POST',
@@ -88,8 +119,15 @@ async function takePhoto() {
                 document.body.style.background = 'linear-gradient(135deg, #667eea 0%, #764ba2 100%)';
             }, 200);
 
+            // The capture response already carries the new counts, so no status round-trip is needed
+            if (currentSessionData) {
+                Object.assign(currentSessionData, {
+                    photo_count: data.photo_count,
+                    capture_complete: data.capture_complete
+                });
+                updateButtonStates();
+            }
             updateStatus(`Photo ${data.photo_count}/${data.max_capture_photos} captured`);
-            await updateSessionStatus();
         } else {
             const error = await response.text();
             console.error('Failed to capture photo:', error);
@@ -102,9 +140,9 @@ async function takePhoto() {
 }
 
 async function startAutoMode() {
-    const startAutoBtn = document.getElementById('startAutoBtn');
-    const stopAutoBtn = document.getElementById('stopAutoBtn');
-    const autoModeInfo = document.getElementById('autoModeInfo');
+    const startAutoBtn = els.startAutoBtn;
+    const stopAutoBtn = els.stopAutoBtn;
+    const autoModeInfo = els.autoModeInfo;
 
     if (startAutoBtn) startAutoBtn.style.display = 'none';
     if (stopAutoBtn) stopAutoBtn.style.display = 'block';
@@ -113,26 +151,47 @@ async function startAutoMode() {
     await createSession();
 
     const maxPhotos = CAPTURE_LIMITS[selectedLayout];
-    let photosTaken = 0;
+    // Every shot gets a fixed deadline up front; captures fire on time without waiting for the previous one
+    const firstShot = performance.now() + BURST_START_DELAY + COUNTDOWN_MS;
+    autoBurst = {
+        schedule: Array.from({ length: maxPhotos }, (_, i) => firstShot + i * (COUNTDOWN_MS + BURST_GAP)),
+        next: 0,
+        done: 0,
+        captures: []
+    };
 
-    const takePhotoInBurst = async () => {
-        if (photosTaken < maxPhotos) {
-            const autoModeText = document.getElementById('autoModeText');
-            if (autoModeText) {
-                autoModeText.textContent = `Taking photo ${photosTaken + 1}/${maxPhotos}...`;
-            }
-            await takePhoto();
-            photosTaken++;
+    const autoModeText = els.autoModeText;
+    if (autoModeText) {
+        autoModeText.textContent = 'Starting auto burst mode...';
+    }
+    requestAnimationFrame(burstStep);
+}
+
+function burstStep(now) {
+    const burst = autoBurst;
+    if (!burst) return;
+
+    const total = burst.schedule.length;
+    const deadline = burst.schedule[burst.next];
+    renderCountdown(deadline - now);
 
-            const progressFill = document.getElementById('progressFill');
-            if (progressFill) {
-                const progress = (photosTaken / maxPhotos) * 100;
-                progressFill.style.width = `${progress}%`;
+    if (now >= deadline) {
+        const autoModeText = els.autoModeText;
+        if (autoModeText) {
+            autoModeText.textContent = `Taking photo ${burst.next + 1}/${total}...`;
+        }
+        burst.captures.push(capturePhoto().then(() => {
+            burst.done++;
+            const progressFill = els.progressFill;
+            if (progressFill && autoBurst === burst) {
+                progressFill.style.transform = `scaleX(${burst.done / total})`;
             }
+        }));
+        burst.next++;
 
-            if (photosTaken < maxPhotos) {
-                autoTimeout = setTimeout(takePhotoInBurst, 3000);
-            } else {
+        if (burst.next === total) {
+            Promise.all(burst.captures).then(() => {
+                if (autoBurst !== burst) return;
                 if (autoModeText) {
                     autoModeText.textContent = 'All photos captured! Ready for selection.';
                 }
@@ -140,32 +199,28 @@ async function startAutoMode() {
                     stopAutoMode();
                     setTimeout(showPhotoSelection, 1000);
                 }, 1000);
-            }
+            });
+            return;
         }
-    };
-
-    const autoModeText = document.getElementById('autoModeText');
-    if (autoModeText) {
-        autoModeText.textContent = 'Starting auto burst mode...';
     }
-    autoTimeout = setTimeout(takePhotoInBurst, 2000);
+    requestAnimationFrame(burstStep);
 }
 
 function stopAutoMode() {
-    if (autoTimeout) {
-        clearTimeout(autoTimeout);
-        autoTimeout = null;
+    if (autoBurst) {
+        autoBurst = null;
+        renderCountdown(0);
     }
 
-    const startAutoBtn = document.getElementById('startAutoBtn');
-    const stopAutoBtn = document.getElementById('stopAutoBtn');
-    const autoModeInfo = document.getElementById('autoModeInfo');
-    const progressFill = document.getElementById('progressFill');
+    const startAutoBtn = els.startAutoBtn;
+    const stopAutoBtn = els.stopAutoBtn;
+    const autoModeInfo = els.autoModeInfo;
+    const progressFill = els.progressFill;
 
     if (startAutoBtn) startAutoBtn.style.display = captureMode !== 'manual' ? 'block' : 'none';
     if (stopAutoBtn) stopAutoBtn.style.display = 'none';
     if (autoModeInfo) autoModeInfo.style.display = 'none';
-    if (progressFill) progressFill.style.width = '0%';
+    if (progressFill) progressFill.style.transform = 'scaleX(0)';
 }
 
 async function showPhotoSelection() {
@@ -174,19 +229,30 @@ async function showPhotoSelection() {
         return;
     }
 
-    const selectionScreen = document.getElementById('photoSelectionScreen');
-    const photosGrid = document.getElementById('photosGrid');
-    const selectionInstruction = document.getElementById('selectionInstruction');
-    const selectionCounter = document.getElementById('selectionCounter');
+    const selectionScreen = els.photoSelectionScreen;
+    const photosGrid = els.photosGrid;
+    const selectionInstruction = els.selectionInstruction;
+    const selectionCounter = els.selectionCounter;
 
     if (!selectionScreen || !photosGrid) {
         console.error('Photo selection elements not found');
         return;
     }
 
+    let photos;
+    try {
+        photos = await fetchSessionPhotos();
+    } catch (error) {
+        console.error('Error loading session photos:', error);
+        updateStatus('Failed to load photos');
+        return;
+    }
+    revokeSelectionPhotos();
+    selectionPhotoUrls = photos.map(blob => URL.createObjectURL(blob));
+
     const finalCount = FINAL_LIMITS[currentSessionData.layout];
     if (selectionInstruction) {
-        selectionInstruction.textContent = `Choose ${finalCount} photos from ${currentSessionData.photos.length} captured photos`;
+        selectionInstruction.textContent = `Choose ${finalCount} photos from ${selectionPhotoUrls.length} captured photos`;
     }
     if (selectionCounter) {
         selectionCounter.textContent = `0 of ${finalCount} photos selected`;
@@ -195,17 +261,23 @@ async function showPhotoSelection() {
     photosGrid.className = `photos-grid ${currentSessionData.layout}-selection`;
     photosGrid.innerHTML = '';
     selectedPhotoIndices = [];
+    photoOptionEls = [];
+    indicatorEls = [];
 
-    currentSessionData.photos.forEach((photo, index) => {
+    selectionPhotoUrls.forEach((url, index) => {
         const photoDiv = document.createElement('div');
         photoDiv.className = 'photo-option';
-        photoDiv.onclick = () => togglePhotoSelection(index);
+        // Clicks reach togglePhotoSelection through the document-level data-action handler
+        photoDiv.dataset.action = 'togglePhotoSelection';
+        photoDiv.dataset.arg = index;
 
         photoDiv.innerHTML = `
-            <img src="data:image/jpeg;base64,${photo}" alt="Photo ${index + 1}">
+            <img src="${url}" alt="Photo ${index + 1}" decoding="async">
             <div class="selection-indicator">${index + 1}</div>
         `;
 
+        photoOptionEls.push(photoDiv);
+        indicatorEls.push(photoDiv.lastElementChild);
         photosGrid.appendChild(photoDiv);
     });
 
@@ -213,10 +285,33 @@ async function showPhotoSelection() {
     updateSelectionUI();
 }
 
+async function fetchSessionPhotos() {
+    // Layout: [u32 count][u32 len0][jpeg0][u32 len1][jpeg1]..., big-endian
+    const response = await fetch('/api/session/thumbs/binary');
+    if (!response.ok) throw new Error(`HTTP ${response.status}`);
+    const buffer = await response.arrayBuffer();
+    const view = new DataView(buffer);
+    const count = view.getUint32(0);
+    const photos = [];
+    let offset = 4;
+    for (let i = 0; i < count; i++) {
+        const length = view.getUint32(offset);
+        offset += 4;
+        photos.push(new Blob([new Uint8Array(buffer, offset, length)], { type: 'image/jpeg' }));
+        offset += length;
+    }
+    return photos;
+}
+
+function revokeSelectionPhotos() {
+    selectionPhotoUrls.forEach(url => URL.revokeObjectURL(url));
+    selectionPhotoUrls = [];
+}
+
 function togglePhotoSelection(index) {
+    index = Number(index);
     const finalCount = FINAL_LIMITS[currentSessionData.layout];
-    const photoOptions = document.querySelectorAll('.photo-option');
-    const photoOption = photoOptions[index];
+    const photoOption = photoOptionEls[index];
 
     if (selectedPhotoIndices.includes(index)) {
         selectedPhotoIndices = selectedPhotoIndices.filter(i => i !== index);
@@ -230,11 +325,12 @@ function togglePhotoSelection(index) {
 }
 
 function closePhotoSelection() {
-    const selectionScreen = document.getElementById('photoSelectionScreen');
+    const selectionScreen = els.photoSelectionScreen;
     if (selectionScreen) {
         selectionScreen.style.display = 'none';
     }
     selectedPhotoIndices = [];
+    revokeSelectionPhotos();
 }
 
 async function confirmSelection() {
@@ -287,6 +383,9 @@ async function finishSession() {
             setTimeout(() => {
                 updateSessionStatus();
             }, 5000);
+        } else if (response.status === 409) {
+            // Another finalize (button press or the scheduled one) already owns this session
+            console.log('Session is already being finalized');
         } else {
             console.error('Failed to finish session');
             updateStatus('Error finishing session');
@@ -308,13 +407,13 @@ async function resetSession() {
         await updateSessionStatus();
         updateStatus('Session reset - ready for new photos!');
 
-        const preview = document.getElementById('preview');
-        const captureInfo = document.getElementById('captureInfo');
-        const captureProgressFill = document.getElementById('captureProgressFill');
+        const preview = els.preview;
+        const captureInfo = els.captureInfo;
+        const captureProgressFill = els.captureProgressFill;
 
         if (preview) preview.className = '';
         if (captureInfo) captureInfo.style.display = 'none';
-        if (captureProgressFill) captureProgressFill.style.width = '0%';
+        if (captureProgressFill) captureProgressFill.style.transform = 'scaleX(0)';
     } catch (error) {
         console.error('Error resetting session:', error);
     }
@@ -323,37 +422,34 @@ async function resetSession() {
 async function showGallery() {
     try {
         const response = await fetch('/api/photos');
-        const data = await response.json();
+        const body = await response.text();
 
-        const galleryContent = document.getElementById('galleryContent');
-        const galleryModal = document.getElementById('galleryModal');
+        const galleryContent = els.galleryContent;
+        const galleryModal = els.galleryModal;
 
         if (!galleryContent || !galleryModal) {
             console.error('Gallery elements not found');
             return;
         }
 
-        if (data.photos.length === 0) {
-            galleryContent.innerHTML = '<p style="text-align: center; font-size: 1.2rem; margin: 2rem 0;">No photos yet!</p>';
-        } else {
-            galleryContent.innerHTML = data.photos.map(photo => `
-                <div class="gallery-item">
-                    <div class="gallery-item-info">
-                        <h3>${photo.filename}</h3>
-                        <p>Created: ${new Date(photo.created).toLocaleString()}</p>
-                        <p>Size: ${(photo.size / 1024).toFixed(1)} KB</p>
-                    </div>
-                    <a href="${photo.download_url}" download class="btn btn-primary" style="text-decoration: none; padding: 1rem 1.5rem; margin-left: 1rem; min-width: auto;">Download</a>
-                </div>
-            `).join('');
+        // Reopening with an unchanged listing keeps the rows already in the DOM
+        if (body !== lastGalleryBody) {
+            const data = JSON.parse(body);
+            if (data.photos.length === 0) {
+                galleryContent.innerHTML = '<p style="text-align: center; font-size: 1.2rem; margin: 2rem 0;">No photos yet!</p>';
+            } else {
+                galleryContent.replaceChildren(buildGalleryRows(data.photos));
+            }
+            lastGalleryBody = body;
         }
 
         galleryModal.style.display = 'block';
     } catch (error) {
         console.error('Error loading gallery:', error);
-        const galleryContent = document.getElementById('galleryContent');
-        const galleryModal = document.getElementById('galleryModal');
+        const galleryContent = els.galleryContent;
+        const galleryModal = els.galleryModal;
 
+        lastGalleryBody = null;
         if (galleryContent) {
             galleryContent.innerHTML = '<p style="text-align: center; font-size: 1.2rem; margin: 2rem 0; color: #ff6b6b;">Error loading gallery</p>';
         }
@@ -363,16 +459,31 @@ async function showGallery() {
     }
 }
 
+function buildGalleryRows(photos) {
+    // Rows are cloned from the template, so file names are set as text and never parsed as HTML
+    const template = els.galleryItemTemplate.content.firstElementChild;
+    const fragment = document.createDocumentFragment();
+    photos.forEach(photo => {
+        const row = template.cloneNode(true);
+        row.querySelector('h3').textContent = photo.filename;
+        row.querySelector('.gallery-item-created').textContent = `Created: ${GALLERY_DATE_FORMAT.format(new Date(photo.created))}`;
+        row.querySelector('.gallery-item-size').textContent = `Size: ${GALLERY_SIZE_FORMAT.format(photo.size / 1024)} KB`;
+        row.lastElementChild.href = photo.download_url;
+        fragment.appendChild(row);
+    });
+    return fragment;
+}
+
 function closeGallery() {
-    const galleryModal = document.getElementById('galleryModal');
+    const galleryModal = els.galleryModal;
     if (galleryModal) {
         galleryModal.style.display = 'none';
     }
 }
 
 function updateOrientationLabels() {
-    const portraitLabel = document.getElementById('portraitLabel');
-    const landscapeLabel = document.getElementById('landscapeLabel');
+    const portraitLabel = els.portraitLabel;
+    const landscapeLabel = els.landscapeLabel;
 
     if (!portraitLabel || !landscapeLabel) return;
 
@@ -415,42 +526,53 @@ async function createSession() {
 
 function showCountdown() {
     return new Promise((resolve) => {
-        const countdownEl = document.getElementById('countdown');
-        if (!countdownEl) {
+        if (!els.countdown) {
             resolve();
             return;
         }
 
-        countdownEl.style.display = 'block';
-        let count = 3;
-        countdownEl.textContent = count;
+        // The deadline is fixed up front, so a late frame never stretches the countdown
+        const deadline = performance.now() + COUNTDOWN_MS;
+        renderCountdown(COUNTDOWN_MS);
 
-        const interval = setInterval(() => {
-            count--;
-            if (count > 0) {
-                countdownEl.textContent = count;
-            } else {
-                countdownEl.textContent = 'SMILE!';
-                setTimeout(() => {
-                    countdownEl.style.display = 'none';
-                    clearInterval(interval);
-                    resolve();
-                }, 500);
+        const step = (now) => {
+            renderCountdown(deadline - now);
+            if (now >= deadline) {
+                resolve();
+                return;
             }
-        }, 1000);
+            requestAnimationFrame(step);
+        };
+        requestAnimationFrame(step);
     });
 }
 
+function renderCountdown(remaining) {
+    const countdownEl = els.countdown;
+    if (!countdownEl) return;
+
+    if (remaining <= 0 || remaining > COUNTDOWN_MS) {
+        if (countdownEl.style.display !== 'none') countdownEl.style.display = 'none';
+        return;
+    }
+
+    const count = Math.ceil((remaining - SMILE_MS) / 1000);
+    const label = count > 0 ? String(count) : 'SMILE!';
+    if (countdownEl.textContent !== label) {
+        countdownEl.textContent = label;
+    }
+    if (countdownEl.style.display !== 'block') countdownEl.style.display = 'block';
+}
+
 function updateCaptureProgress(current, total) {
-    const progressFill = document.getElementById('captureProgressFill');
-    const captureInfo = document.getElementById('captureInfo');
-    const captureInfoText = document.getElementById('captureInfoText');
+    const progressFill = els.captureProgressFill;
+    const captureInfo = els.captureInfo;
+    const captureInfoText = els.captureInfoText;
 
     if (current > 0) {
         if (captureInfo) captureInfo.style.display = 'block';
         if (progressFill) {
-            const progress = (current / total) * 100;
-            progressFill.style.width = `${progress}%`;
+            progressFill.style.transform = `scaleX(${current / total})`;
         }
         if (captureInfoText) {
             captureInfoText.textContent = `Captured ${current} of ${total} photos`;
@@ -463,11 +585,10 @@ function updateCaptureProgress(current, total) {
     }
 }
 
-async function updateSessionStatus() {
+async function updateSessionStatus(session) {
     try {
-        const response = await fetch('/api/session/status');
-        const data = await response.json();
-        currentSessionData = data;
+        // State pushed over the WebSocket is used as-is; only fall back to HTTP without it
+        currentSessionData = session || await (await fetch('/api/session/status')).json();
         updateButtonStates();
         updateStatus();
     } catch (error) {
@@ -475,10 +596,24 @@ async function updateSessionStatus() {
     }
 }
 
+async function loadInitialState() {
+    try {
+        const response = await fetch('/api/initial-state');
+        const data = await response.json();
+        Object.assign(CAPTURE_LIMITS, data.capture_limits);
+        Object.assign(FINAL_LIMITS, data.final_limits);
+        currentSessionData = data.session;
+        updateButtonStates();
+        updateStatus();
+    } catch (error) {
+        console.error('Error loading initial state:', error);
+    }
+}
+
 function updateButtonStates() {
-    const takePhotoBtn = document.getElementById('takePhotoBtn');
-    const selectPhotosBtn = document.getElementById('selectPhotosBtn');
-    const finishBtn = document.getElementById('finishBtn');
+    const takePhotoBtn = els.takePhotoBtn;
+    const selectPhotosBtn = els.selectPhotosBtn;
+    const finishBtn = els.finishBtn;
 
     if (currentSessionData && currentSessionData.session_id) {
         const maxCapturePhotos = currentSessionData.max_capture_photos || CAPTURE_LIMITS[currentSessionData.layout];
@@ -514,36 +649,48 @@ function updateButtonStates() {
     }
 }
 
-function showFinalPhoto(imageData) {
-    const preview = document.getElementById('preview');
-    if (preview) {
-        preview.src = `data:image/jpeg;base64,${imageData}`;
+async function showFinalPhoto(imageData) {
+    const preview = els.preview;
+    if (!preview) return;
+
+    try {
+        const blob = await (await fetch(`data:image/jpeg;base64,${imageData}`)).blob();
+        paintPreview(await createImageBitmap(blob));
         preview.className = 'final-photo';
+    } catch (error) {
+        console.error('Error decoding final photo:', error);
     }
 }
 
 function updateStatus(message) {
-    const statusEl = document.getElementById('status');
+    const statusEl = els.status;
     if (!statusEl) return;
 
+    let text;
     if (message) {
-        statusEl.textContent = message;
+        text = message;
     } else if (currentSessionData && currentSessionData.session_id) {
         const captureLimit = CAPTURE_LIMITS[selectedLayout];
         const finalLimit = FINAL_LIMITS[selectedLayout];
         const currentCount = currentSessionData.photo_count || 0;
 
         if (currentSessionData.capture_complete && !currentSessionData.selection_complete) {
-            statusEl.textContent = `${captureLimit} photos captured • Ready to select ${finalLimit} favorites`;
+            text = `${captureLimit} photos captured • Ready to select ${finalLimit} favorites`;
         } else if (currentSessionData.selection_complete) {
-            statusEl.textContent = `Photos selected • Creating ${selectedLayout.toUpperCase()} ${selectedOrientation} collage`;
+            text = `Photos selected • Creating ${selectedLayout.toUpperCase()} ${selectedOrientation} collage`;
         } else {
-            statusEl.textContent = `${currentCount}/${captureLimit} photos • Select ${finalLimit} • ${selectedLayout.toUpperCase()} ${selectedOrientation}`;
+            text = `${currentCount}/${captureLimit} photos • Select ${finalLimit} • ${selectedLayout.toUpperCase()} ${selectedOrientation}`;
         }
     } else {
         const captureLimit = CAPTURE_LIMITS[selectedLayout];
         const finalLimit = FINAL_LIMITS[selectedLayout];
-        statusEl.textContent = `Ready: ${selectedLayout.toUpperCase()} ${selectedOrientation} • Capture ${captureLimit}→Select ${finalLimit}`;
+        text = `Ready: ${selectedLayout.toUpperCase()} ${selectedOrientation} • Capture ${captureLimit}→Select ${finalLimit}`;
+    }
+
+    // Status is refreshed on every event and poll; skip the DOM write when the text is unchanged
+    if (text !== lastStatusText) {
+        statusEl.textContent = text;
+        lastStatusText = text;
     }
 }
 
@@ -551,24 +698,20 @@ function updateSelectionUI() {
     if (!currentSessionData) return;
 
     const finalCount = FINAL_LIMITS[currentSessionData.layout];
-    const selectionCounter = document.getElementById('selectionCounter');
-    const confirmBtn = document.getElementById('confirmSelectionBtn');
+    const selectionCounter = els.selectionCounter;
+    const confirmBtn = els.confirmSelectionBtn;
 
     if (selectionCounter) {
         selectionCounter.textContent = `${selectedPhotoIndices.length} of ${finalCount} photos selected`;
     }
 
-    document.querySelectorAll('.photo-option').forEach((photoOption, index) => {
-        const indicator = photoOption.querySelector('.selection-indicator');
-        if (indicator) {
-            if (selectedPhotoIndices.includes(index)) {
-                const selectionOrder = selectedPhotoIndices.indexOf(index) + 1;
-                indicator.textContent = selectionOrder;
-            } else {
-                indicator.textContent = index + 1;
-            }
+    // Only indicators whose number changed are touched, so a click costs O(changed) DOM writes
+    for (let index = 0; index < indicatorEls.length; index++) {
+        const label = String(selectedPhotoIndices.indexOf(index) + 1 || index + 1);
+        if (indicatorEls[index].textContent !== label) {
+            indicatorEls[index].textContent = label;
         }
-    });
+    }
 
     if (confirmBtn) {
         confirmBtn.disabled = selectedPhotoIndices.length !== finalCount;
@@ -576,32 +719,72 @@ function updateSelectionUI() {
 }
 
 // WebSocket and initialization
+function drawPreview() {
+    const frame = latestPreview;
+    latestPreview = null;
+    if (!frame || !els.preview) {
+        previewFramePending = false;
+        return;
+    }
+
+    // createImageBitmap decodes off the main thread; the flag stays set until the frame is painted,
+    // so at most one decode is in flight and the newest frame that arrived meanwhile goes next
+    createImageBitmap(new Blob([frame], { type: 'image/jpeg' }))
+        .then(paintPreview)
+        .catch(error => console.error('Error decoding preview frame:', error))
+        .finally(() => {
+            previewFramePending = false;
+            if (latestPreview) {
+                previewFramePending = true;
+                requestAnimationFrame(drawPreview);
+            }
+        });
+}
+
+function paintPreview(bitmap) {
+    const preview = els.preview;
+    if (preview.width !== bitmap.width || preview.height !== bitmap.height) {
+        preview.width = bitmap.width;
+        preview.height = bitmap.height;
+    }
+    previewCtx.drawImage(bitmap, 0, 0);
+    bitmap.close();
+}
+
 function initWebSocket() {
     const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
     const wsUrl = `${protocol}//${window.location.host}/ws`;
     ws = new WebSocket(wsUrl);
+    ws.binaryType = 'arraybuffer';
+
+    ws.onopen = function() {
+        wsBackoff = WS_BACKOFF_MIN;
+        lastMessageAt = Date.now();
+        clearInterval(heartbeatTimer);
+        heartbeatTimer = setInterval(heartbeat, HEARTBEAT_INTERVAL);
+        if (document.hidden) ws.send('hidden');
+        stopStatusPolling();
+        // Changes pushed while the socket was down were missed, so resync once on (re)connect
+        updateSessionStatus();
+    };
 
     ws.onmessage = function(event) {
-        const data = JSON.parse(event.data);
-
-        if (data.type === 'preview') {
-            const preview = document.getElementById('preview');
-            if (preview) {
-                preview.src = `data:image/jpeg;base64,${data.data}`;
+        lastMessageAt = Date.now();
+        if (event.data instanceof ArrayBuffer) {
+            // Keep only the newest frame; frames arriving between paints are never decoded
+            latestPreview = event.data;
+            if (!previewFramePending) {
+                previewFramePending = true;
+                requestAnimationFrame(drawPreview);
             }
-        } else if (data.type === 'photo_captured') {
-            updateSessionStatus();
-            updateCaptureProgress(data.photo_count, data.max_capture_photos);
+            return;
+        }
 
-            if (data.capture_complete) {
-                console.log('Capture phase complete - ready for selection');
-            }
-        } else if (data.type === 'selection_complete') {
-            console.log('Photo selection completed');
-        } else if (data.type === 'session_complete') {
-            showFinalPhoto(data.collage);
-            stopAutoMode();
-            updateSessionStatus();
+        const data = JSON.parse(event.data);
+        if (data.type === 'batch') {
+            data.events.forEach(handleMessage);
+        } else {
+            handleMessage(data);
         }
     };
 
@@ -612,10 +795,72 @@ function initWebSocket() {
 
     ws.onclose = function() {
         console.log('WebSocket connection closed');
-        setTimeout(initWebSocket, 3000);
+        clearInterval(heartbeatTimer);
+        startStatusPolling();
+        // Full jitter keeps a fleet of kiosks from reconnecting in lockstep after a server restart
+        const delay = Math.random() * wsBackoff;
+        wsBackoff = Math.min(wsBackoff * 2, WS_BACKOFF_MAX);
+        setTimeout(initWebSocket, delay);
     };
 }
 
+function handleMessage(data) {
+    // State-changing events carry the full session status, which replaces the local copy
+    if (data.session) updateSessionStatus(data.session);
+
+    if (data.type === 'photo_captured') {
+        updateCaptureProgress(data.photo_count, data.max_capture_photos);
+
+        if (data.capture_complete) {
+            console.log('Capture phase complete - ready for selection');
+        }
+    } else if (data.type === 'selection_complete') {
+        console.log('Photo selection completed');
+    } else if (data.type === 'session_complete') {
+        showFinalPhoto(data.collage);
+        stopAutoMode();
+    }
+}
+
+// Status is only polled over HTTP while the WebSocket is down and cannot push it
+function startStatusPolling() {
+    if (!pollTimer) pollTimer = setInterval(pollStatus, STATUS_POLL_INTERVAL);
+}
+
+function pollStatus() {
+    // Nobody sees a hidden page, and a visible one polls when the main thread is idle
+    if (document.hidden) return;
+    if (window.requestIdleCallback) {
+        requestIdleCallback(() => updateSessionStatus(), { timeout: STATUS_POLL_INTERVAL });
+    } else {
+        updateSessionStatus();
+    }
+}
+
+function stopStatusPolling() {
+    clearInterval(pollTimer);
+    pollTimer = null;
+}
+
+function heartbeat() {
+    if (!ws || ws.readyState !== WebSocket.OPEN) return;
+    // Any message (previews included) proves the link is alive; silence means a dead peer.
+    // Hidden tabs get no previews and throttled timers, so only judge the link while visible
+    if (!document.hidden && Date.now() - lastMessageAt > HEARTBEAT_TIMEOUT) {
+        ws.close();
+        return;
+    }
+    ws.send('ping');
+}
+
+function handleVisibilityChange() {
+    if (!document.hidden) lastMessageAt = Date.now();
+    // The server stops encoding previews once every connected page is hidden
+    if (ws && ws.readyState === WebSocket.OPEN) {
+        ws.send(document.hidden ? 'hidden' : 'visible');
+    }
+}
+
 function initFullscreen() {
     const elem = document.documentElement;
     if (elem.requestFullscreen) {
@@ -631,42 +876,92 @@ function initFullscreen() {
 }
 
 function closeDropdownOnClickOutside(event) {
-    const dropdown = document.getElementById('settingsDropdown');
+    const dropdown = els.settingsDropdown;
     if (dropdown && !dropdown.contains(event.target) && dropdown.classList.contains('open')) {
         dropdown.classList.remove('open');
     }
 }
 
+const ACTIONS = {
+    showGallery,
+    closeGallery,
+    toggleSettingsDropdown,
+    selectLayout,
+    selectOrientation,
+    selectMode,
+    takePhoto,
+    startAutoMode,
+    stopAutoMode,
+    showPhotoSelection,
+    closePhotoSelection,
+    togglePhotoSelection,
+    confirmSelection,
+    finishSession,
+    resetSession
+};
+
+function handleActionClick(event) {
+    const target = event.target.closest('[data-action]');
+    if (!target) return;
+
+    const action = ACTIONS[target.dataset.action];
+    if (action) action(target.dataset.arg);
+}
+
 function init() {
     console.log('Initializing Touchscreen Photobooth...');
+    // Looked up once; handlers read these instead of querying the DOM
+    els = Object.freeze({
+        preview: document.getElementById('preview'),
+        settingsDropdown: document.getElementById('settingsDropdown'),
+        takePhotoBtn: document.getElementById('takePhotoBtn'),
+        startAutoBtn: document.getElementById('startAutoBtn'),
+        stopAutoBtn: document.getElementById('stopAutoBtn'),
+        autoModeInfo: document.getElementById('autoModeInfo'),
+        autoModeText: document.getElementById('autoModeText'),
+        progressFill: document.getElementById('progressFill'),
+        photoSelectionScreen: document.getElementById('photoSelectionScreen'),
+        photosGrid: document.getElementById('photosGrid'),
+        selectionInstruction: document.getElementById('selectionInstruction'),
+        selectionCounter: document.getElementById('selectionCounter'),
+        status: document.getElementById('status'),
+        captureInfo: document.getElementById('captureInfo'),
+        captureProgressFill: document.getElementById('captureProgressFill'),
+        galleryContent: document.getElementById('galleryContent'),
+        galleryItemTemplate: document.getElementById('galleryItemTemplate'),
+        galleryModal: document.getElementById('galleryModal'),
+        portraitLabel: document.getElementById('portraitLabel'),
+        landscapeLabel: document.getElementById('landscapeLabel'),
+        countdown: document.getElementById('countdown'),
+        captureInfoText: document.getElementById('captureInfoText'),
+        selectPhotosBtn: document.getElementById('selectPhotosBtn'),
+        finishBtn: document.getElementById('finishBtn'),
+        confirmSelectionBtn: document.getElementById('confirmSelectionBtn')
+    });
+    // Opaque low-latency context; desynchronized lets frames reach the screen without waiting on the page compositor
+    if (els.preview) previewCtx = els.preview.getContext('2d', { alpha: false, desynchronized: true });
     initWebSocket();
     setTimeout(initFullscreen, 1000);
 
-    updateSessionStatus();
+    loadInitialState();
     updateOrientationLabels();
     updateButtonStates();
 
+    document.addEventListener('click', handleActionClick);
+    document.addEventListener('visibilitychange', handleVisibilityChange);
     document.addEventListener('click', closeDropdownOnClickOutside);
     window.addEventListener('click', (event) => {
-        const modal = document.getElementById('galleryModal');
+        const modal = els.galleryModal;
         if (event.target === modal) {
             closeGallery();
         }
 
-        const selectionScreen = document.getElementById('photoSelectionScreen');
+        const selectionScreen = els.photoSelectionScreen;
         if (event.target === selectionScreen) {
             closePhotoSelection();
         }
     });
-    let lastTouchEnd = 0;
-    document.addEventListener('touchend', (e) => {
-        const now = Date.now();
-        if (now - lastTouchEnd <= 300) {
-            e.preventDefault();
-        }
-        lastTouchEnd = now;
-    }, { passive: false });
-    setInterval(updateSessionStatus, 10000);
+    startStatusPolling();
 
     console.log('Touchscreen Photobooth initialized successfully');
 }
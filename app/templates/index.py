@@ -1,158 +1,166 @@
-def get_html_template() -> str:
-    return """
-    <!DOCTYPE html>
-    <html lang="en">
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0, user-scalable=no">
-        <title>Touchscreen Photobooth</title>
-        <link rel="stylesheet" href="/static/css/styles.css">
-    </head>
-    <body>
-        <div class="fullscreen-container">
-            <!-- Header -->
-            <div class="header">
-                <div></div>
-                <div class="status" id="status">Touchscreen Photobooth Ready!</div>
-                <button class="gallery-btn" onclick="showGallery()" aria-label="Open Gallery">📸</button>
-            </div>
-
-            <!-- Main Content -->
-            <div class="main-content">
-                <!-- Full-Screen Camera Preview -->
-                <div class="preview-section">
-                    <div class="preview-container">
-                        <img id="preview" src="" alt="Camera Preview" />
-                    </div>
-                </div>
-
-                <!-- Floating Controls Overlay -->
-                <div class="controls-overlay">
-                    <!-- Settings Dropdown -->
-                    <div class="settings-dropdown" id="settingsDropdown">
-                        <div class="settings-header" onclick="toggleSettingsDropdown()">
-                            <span>Settings</span>
-                            <span class="dropdown-arrow">▼</span>
-                        </div>
-                        <div class="settings-content">
-                            <div class="setting-group">
-                                <div class="setting-label">Layout</div>
-                                <div class="button-group">
-                                    <button class="option-btn active" data-layout="double" onclick="selectLayout('double')">
-                                        Double<br><small>(4→2)</small>
-                                    </button>
-                                    <button class="option-btn" data-layout="quad" onclick="selectLayout('quad')">
-                                        2×2<br><small>(6→4)</small>
-                                    </button>
-                                    <button class="option-btn" data-layout="strip" onclick="selectLayout('strip')">
-                                        Strip<br><small>(12→8)</small>
-                                    </button>
-                                </div>
-                            </div>
-
-                            <div class="setting-group">
-                                <div class="setting-label">Orientation</div>
-                                <div class="button-group">
-                                    <button class="option-btn active" data-orientation="portrait" onclick="selectOrientation('portrait')">
-                                        <span id="portraitLabel">Portrait</span>
-                                    </button>
-                                    <button class="option-btn" data-orientation="landscape" onclick="selectOrientation('landscape')">
-                                        <span id="landscapeLabel">Landscape</span>
-                                    </button>
-                                </div>
-                            </div>
-
-                            <div class="setting-group">
-                                <div class="setting-label">Mode</div>
-                                <div class="button-group">
-                                    <button class="option-btn active" data-mode="manual" onclick="selectMode('manual')">
-                                        Manual
-                                    </button>
-                                    <button class="option-btn" data-mode="burst" onclick="selectMode('burst')">
-                                        Auto Burst
-                                    </button>
-                                </div>
-                            </div>
-                        </div>
-                    </div>
-
-                    <!-- Info Panels -->
-                    <div id="captureInfo" class="floating-info info-panel">
-                        <h3 id="captureInfoTitle">Capture Phase</h3>
-                        <p id="captureInfoText">Ready to capture photos</p>
-                        <div class="progress-bar">
-                            <div class="progress-fill" id="captureProgressFill"></div>
-                        </div>
-                    </div>
-
-                    <div id="autoModeInfo" class="floating-info auto-mode-panel">
-                        <h3>Auto Burst Mode</h3>
-                        <p id="autoModeText">Ready to start</p>
-                        <div class="progress-bar">
-                            <div class="progress-fill" id="progressFill"></div>
-                        </div>
-                    </div>
-
-                    <!-- Action Buttons -->
-                    <div class="action-buttons">
-                        <button class="btn btn-primary" id="takePhotoBtn" onclick="takePhoto()">
-                            📸 Take Photo
-                        </button>
-                        <button class="btn btn-secondary" id="startAutoBtn" onclick="startAutoMode()" style="display: none;">
-                            🚀 Start Auto Burst
-                        </button>
-                        <button class="btn btn-warning" id="stopAutoBtn" onclick="stopAutoMode()" style="display: none;">
-                            ⏹️ Stop Auto Burst
-                        </button>
-                        <button class="btn btn-success" id="selectPhotosBtn" onclick="showPhotoSelection()" style="display: none;" disabled>
-                            🎯 Select Photos
-                        </button>
-                        <button class="btn btn-success" id="finishBtn" onclick="finishSession()" style="display: none;" disabled>
-                            ✅ Finish Session
-                        </button>
-                        <button class="btn btn-secondary" id="resetBtn" onclick="resetSession()">
-                            🔄 Reset
-                        </button>
-                    </div>
-                </div>
-            </div>
-        </div>
-
-        <!-- Countdown Overlay -->
-        <div class="countdown" id="countdown">3</div>
-
-        <!-- Photo Selection Screen -->
-        <div id="photoSelectionScreen" class="photo-selection-screen">
-            <div class="selection-header">
-                <h2>Select Your Best Photos</h2>
-                <p class="selection-instruction" id="selectionInstruction">Choose your favorite photos for the final collage</p>
-                <div class="selection-counter" id="selectionCounter">0 of 2 photos selected</div>
-            </div>
-            <div class="photos-grid" id="photosGrid">
-                <!-- Photos will be inserted here dynamically -->
-            </div>
-            <div class="selection-controls">
-                <button class="btn btn-success" id="confirmSelectionBtn" onclick="confirmSelection()" disabled>
-                    ✅ Confirm Selection
-                </button>
-                <button class="btn btn-secondary" onclick="closePhotoSelection()">
-                    ❌ Cancel
-                </button>
-            </div>
-        </div>
-
-        <!-- Gallery Modal -->
-        <div id="galleryModal" class="modal">
-            <div class="modal-content">
-                <span class="close" onclick="closeGallery()">&times;</span>
-                <h2>Photo Gallery</h2>
-                <div id="galleryContent">
-                    Loading...
-                </div>
-            </div>
-        </div>
-
-        <script src="/static/js/app.js"></script>
-    </body>
-    </html>
-    """
\ No newline at end of file
+import gzip
+import hashlib
+import re
+import time
+from email.utils import formatdate
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional, Tuple
+
+import brotli
+
+from app.config import settings
+
+_TEMPLATE_PATH = Path(__file__).resolve().parent / "index.html"
+_STYLES_PATH = Path(__file__).resolve().parent.parent / "static" / "css" / "styles.css"
+_APP_JS_PATH = Path(__file__).resolve().parent.parent / "static" / "js" / "app.js"
+
+# Top-level rules needed to paint the header and preview, and keep overlays hidden, before styles.css arrives
+CRITICAL_SELECTORS = {
+    "*",
+    "html, body",
+    ".fullscreen-container",
+    ".header",
+    ".status",
+    ".main-content",
+    ".preview-section",
+    ".preview-container",
+    "#preview",
+    ".controls-overlay",
+    ".info-panel",
+    ".auto-mode-panel",
+    ".countdown",
+    ".photo-selection-screen",
+    ".modal",
+    ".icon"
+}
+
+# (value, label, active by default) for each settings button group
+LAYOUT_OPTIONS = [
+    ("double", "Double", True),
+    ("quad", "2&times;2", False),
+    ("strip", "Strip", False)
+]
+
+ORIENTATION_OPTIONS = [
+    ("portrait", '<span id="portraitLabel">Portrait</span>', True),
+    ("landscape", '<span id="landscapeLabel">Landscape</span>', False)
+]
+
+MODE_OPTIONS = [
+    ("manual", "Manual", True),
+    ("burst", "Auto Burst", False)
+]
+
+_RAW_HTML = _TEMPLATE_PATH.read_text(encoding="utf-8")
+
+
+def _critical_css(css: str, selectors: set) -> str:
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.DOTALL)
+    rules = []
+    depth = 0
+    start = 0
+    head_end = 0
+    # Only top-level rules are considered so @media overrides are never inlined unconditionally
+    for match in re.finditer(r"[{}]", css):
+        if match.group() == "{":
+            if depth == 0:
+                head_end = match.start()
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 0:
+                selector = " ".join(css[start:head_end].split())
+                if selector in selectors:
+                    body = " ".join(css[head_end + 1:match.start()].split())
+                    rules.append(f"{selector}{{{body}}}")
+                start = match.end()
+    return "".join(rules)
+
+
+def _option_buttons(kind: str, action: str, options: list) -> str:
+    return "\n".join(
+        f'<button class="option-btn{" active" if active else ""}" data-{kind}="{value}" '
+        f'data-action="{action}" data-arg="{value}">{label}</button>'
+        for value, label, active in options
+    )
+
+
+def _minify(html: str) -> str:
+    # Drop author comments and indentation; newlines are kept so inline text spacing is unchanged
+    html = re.sub(r"<!--.*?-->", "", html, flags=re.DOTALL)
+    return "\n".join(line.strip() for line in html.splitlines() if line.strip())
+
+
+def _versioned(url: str, path: Path) -> str:
+    # The content hash changes the URL whenever the file does, so /static can mark versioned requests immutable
+    return f"{url}?v={hashlib.blake2b(path.read_bytes(), digest_size=8).hexdigest()}"
+
+
+_STYLES_CSS = _STYLES_PATH.read_text(encoding="utf-8")
+
+STYLES_URL = _versioned("/static/css/styles.css", _STYLES_PATH)
+APP_JS_URL = _versioned("/static/js/app.js", _APP_JS_PATH)
+
+_FRAGMENTS = {
+    "critical_css": _critical_css(_STYLES_CSS, CRITICAL_SELECTORS),
+    "styles_url": STYLES_URL,
+    "app_js_url": APP_JS_URL,
+    "layout_buttons": _option_buttons("layout", "selectLayout", [
+        (value, f"{label}<br><small>({settings.capture_limits[value]}&rarr;{settings.final_limits[value]})</small>", active)
+        for value, label, active in LAYOUT_OPTIONS
+    ]),
+    "orientation_buttons": _option_buttons("orientation", "selectOrientation", ORIENTATION_OPTIONS),
+    "mode_buttons": _option_buttons("mode", "selectMode", MODE_OPTIONS)
+}
+
+
+def _render(html: str, fragments: dict) -> str:
+    for name, fragment in fragments.items():
+        html = html.replace("{{ " + name + " }}", fragment)
+    return html
+
+
+_RENDERED_HTML = _render(_RAW_HTML, _FRAGMENTS)
+
+HTML_TEMPLATE: bytes = _minify(_RENDERED_HTML).encode('utf-8')
+# Non-ASCII text belongs in entities and icons in the sprite, so the shell stays plain ASCII
+assert HTML_TEMPLATE.isascii(), "index.html must be ASCII; use entities or the icon sprite"
+
+_HTML_DIGEST = hashlib.blake2b(HTML_TEMPLATE, digest_size=16).hexdigest()
+HTML_LAST_MODIFIED = formatdate(time.time(), usegmt=True)
+
+# Content-Encoding (None for identity) -> body
+HTML_VARIANTS = {
+    None: HTML_TEMPLATE,
+    "gzip": gzip.compress(HTML_TEMPLATE, compresslevel=9),
+    "br": brotli.compress(HTML_TEMPLATE, quality=11)
+}
+
+# Strong validators must differ per content-coding, so each encoded body gets its own ETag
+HTML_ETAGS = {
+    None: f'"{_HTML_DIGEST}"',
+    "gzip": f'"{_HTML_DIGEST}-gz"',
+    "br": f'"{_HTML_DIGEST}-br"'
+}
+
+
+# Browsers send a handful of distinct Accept-Encoding values, so parse each one once
+@lru_cache(maxsize=32)
+def get_encoded(accept_encoding: str) -> Tuple[bytes, Optional[str]]:
+    accepted = set()
+    for token in accept_encoding.split(","):
+        coding, _, params = token.partition(";")
+        params = params.replace(" ", "")
+        if params.startswith("q="):
+            try:
+                if float(params[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(coding.strip().lower())
+
+    for encoding in ("br", "gzip"):
+        if encoding in accepted:
+            return HTML_VARIANTS[encoding], encoding
+    return HTML_VARIANTS[None], None
@@ -1,30 +1,44 @@
+import sys
+
 import uvicorn
-from app.main import app
 from app.config import settings
 
+BANNER = (
+    "🚀 Starting Touchscreen Web Photobooth Server...",
+    "📱 Optimized for touchscreen displays",
+    "🖥️  Will automatically enter fullscreen mode",
+    "📸 Camera will initialize automatically",
+    f"🌐 Access the photobooth at: http://{settings.host}:{settings.port}",
+    f"📁 Photos will be saved to: {settings.photos_dir}",
+    "\n🎯 Features:",
+    "   - Modular FastAPI architecture",
+    "   - Full-screen touchscreen interface",
+    "   - Photo selection workflow",
+    "   - Real-time WebSocket preview",
+    "   - Dependency injection",
+    "   - Configuration management",
+    "\n📱 Photo Selection Process:",
+    "   - Double layout: Capture 4 → Select 2",
+    "   - 2×2 Grid layout: Capture 6 → Select 4",
+    "   - Photo Strip layout: Capture 12 → Select 8",
+    "\n🛑 Press Ctrl+C to stop the server\n"
+)
+
 if __name__ == "__main__":
-    print("🚀 Starting Touchscreen Web Photobooth Server...")
-    print("📱 Optimized for touchscreen displays")
-    print("🖥️  Will automatically enter fullscreen mode")
-    print("📸 Camera will initialize automatically")
-    print(f"🌐 Access the photobooth at: http://{settings.host}:{settings.port}")
-    print(f"📁 Photos will be saved to: {settings.photos_dir}")
-    print("\n🎯 Features:")
-    print("   - Modular FastAPI architecture")
-    print("   - Full-screen touchscreen interface")
-    print("   - Photo selection workflow")
-    print("   - Real-time WebSocket preview")
-    print("   - Dependency injection")
-    print("   - Configuration management")
-    print("\n📱 Photo Selection Process:")
-    print("   - Double layout: Capture 4 → Select 2")
-    print("   - 2×2 Grid layout: Capture 6 → Select 4")
-    print("   - Photo Strip layout: Capture 12 → Select 8")
-    print("\n🛑 Press Ctrl+C to stop the server\n")
+    # One write instead of a syscall per line; skipped when output is captured by a service manager
+    if sys.stdout.isatty():
+        sys.stdout.write("\n".join(BANNER) + "\n")
 
     uvicorn.run(
-        app,
+        "app.main:app",
         host=settings.host,
         port=settings.port,
-        reload=settings.debug
+        reload=settings.debug,
+        # "auto" picks uvloop wherever it is installed; requirements.txt skips it on Windows
+        loop="auto",
+        http="httptools",
+        ws="websockets",
+        access_log=settings.debug,
+        # Preview frames are already JPEG; deflating them only burns CPU on both ends
+        ws_per_message_deflate=False
     )
\ No newline at end of file